@@ -0,0 +1,271 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Benchmarks of config creation, loading, merging and resolution.
+
+Usage (with the package installed, e.g. by `poetry install`):
+
+    python benchmarks/bench.py --save baseline.json
+    python benchmarks/bench.py --compare baseline.json
+
+Each benchmark reports the best time per call over several repetitions. With
+`--compare`, benchmarks slower than the baseline by more than `--threshold`
+are reported as regressions and the script exits with status 1.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+from dataclasses import field, make_dataclass
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import optuna
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+from omegatuna.omegatuna import _get_trial_or_raise, _set_trial
+
+# (number of keys, number of `ot.*` nodes)
+SIZES = [(10, 1), (1000, 1), (1000, 100), (1000, 1000), (100000, 100), (100000, 1000)]
+QUICK_SIZES = [(10, 1), (1000, 100)]
+
+# Structured configs are generated as dataclasses, one field per key.
+MAX_STRUCTURED_KEYS = 1000
+
+# Numbers of fields of the nested dataclasses used to measure the per-trial cost
+# of `OmegaTuna.structured` as a schema grows, with and without the schema cache.
+SCHEMA_FIELDS = [10, 100, 1000]
+
+# Batch creation is measured for `BATCH_SIZE` trials on configs up to this size.
+BATCH_SIZE = 16
+MAX_BATCH_KEYS = 1000
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+
+def make_dict(n_keys: int, n_params: int) -> Dict[str, Any]:
+    conf: Dict[str, Any] = {}
+    for i in range(n_keys):
+        group = conf.setdefault(f"group{i // 100}", {})
+        if i < n_params:
+            group[f"p{i}"] = f"${{ot.float: p{i}, {{low: 0.0, high: 1.0}}}}"
+        else:
+            group[f"k{i}"] = i
+    return conf
+
+
+def make_dotlist(n_keys: int, n_params: int) -> List[str]:
+    return [
+        f"p{i}=${{ot.float:{{low:0.0, high:1.0}}}}" if i < n_params else f"k{i}={i}"
+        for i in range(n_keys)
+    ]
+
+
+def make_dataclass_type(n_keys: int, n_params: int) -> type:
+    fields = [
+        (
+            f"p{i}",
+            float,
+            field(default="${ot.float: {low: 0.0, high: 1.0}}"),
+        )
+        if i < n_params
+        else (f"k{i}", int, field(default=i))
+        for i in range(n_keys)
+    ]
+    return make_dataclass(f"Conf{n_keys}x{n_params}", fields)
+
+
+def make_nested_dataclass_type(n_fields: int) -> type:
+    # Groups of 10 fields, one of which is an `ot.*` node, nested in a root type.
+    # The types are bound to module-level names, as pickling needs for them to be
+    # cached like the dataclasses of a real schema.
+    groups = []
+    for g in range((n_fields + 9) // 10):
+        fields = [
+            (f"p{g}", float, field(default="${ot.float: {low: 0.0, high: 1.0}}"))
+        ] + [(f"k{i}", int, field(default=i)) for i in range(1, 10)]
+        group = _module_level(make_dataclass(f"Group{n_fields}_{g}", fields))
+        groups.append((f"group{g}", group, field(default_factory=group)))
+    return _module_level(make_dataclass(f"Schema{n_fields}", groups))
+
+
+def _module_level(cls: type) -> type:
+    cls.__module__ = __name__
+    globals()[cls.__name__] = cls
+    return cls
+
+
+def fixed_trial(n_params: int) -> FixedTrial:
+    return FixedTrial({f"p{i}": 0.5 for i in range(n_params)})
+
+
+def first_param(conf: Any) -> Callable[[], Any]:
+    return lambda: conf.group0.p0
+
+
+def bind_first_param(stack: Any, trial: FixedTrial) -> Callable[[], Any]:
+    def func() -> Any:
+        with stack.bind(trial) as conf:
+            return conf.group0.p0
+
+    return func
+
+
+def python(code: str) -> Callable[[], Any]:
+    return lambda: subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def benchmarks(
+    sizes: List[Tuple[int, int]], tmpdir: str
+) -> Iterator[Tuple[str, Callable[[], Any]]]:
+    # Cold-start cost of a new interpreter; `import/python` is the baseline.
+    yield "import/python", python("pass")
+    yield "import/omegatuna", python("import omegatuna")
+    yield "import/omegatuna_defaults", python(
+        "from omegatuna import OmegaTuna\n"
+        "OmegaTuna.create({'p': '${ot.int: {low: 0, high: 1, default: 0}}'}).p"
+    )
+    yield "import/omegatuna_optuna", python("import omegatuna, optuna")
+
+    for n_keys, n_params in sizes:
+        if n_params > n_keys:
+            continue
+        tag = f"{n_keys}x{n_params}"
+        d = make_dict(n_keys, n_params)
+        trial = fixed_trial(n_params)
+
+        yield f"create/dict/{tag}", lambda: OmegaTuna.create(d)
+        yield f"create/dict_trial/{tag}", lambda: OmegaTuna.create(d, trial=trial)
+
+        path = os.path.join(tmpdir, f"{tag}.yml")
+        OmegaTuna.save(OmegaTuna.create(d), path)
+        yield f"load/yaml/{tag}", lambda: OmegaTuna.load(path, trial=trial)
+
+        dotlist = make_dotlist(n_keys, n_params)
+        yield f"create/dotlist/{tag}", lambda: OmegaTuna.from_dotlist(
+            dotlist, trial=trial
+        )
+
+        if n_keys <= MAX_STRUCTURED_KEYS:
+            cls = make_dataclass_type(n_keys, n_params)
+            yield f"create/structured/{tag}", lambda: OmegaTuna.structured(
+                cls, trial=trial
+            )
+
+        base = OmegaTuna.create(d, trial=trial)
+        other = OmegaTuna.create({"group0": {"extra": 1}})
+        yield f"merge/{tag}", lambda: OmegaTuna.merge(base, other)
+        stack = OmegaTuna.merge_stack(d, {"group0": {"extra": 1}})
+        yield f"merge/stack/{tag}", lambda: stack.merge(other, trial=trial)
+        yield f"merge/stack_bind/{tag}", bind_first_param(stack, trial)
+        yield f"get_trial/{tag}", lambda: _get_trial_or_raise([base, other])
+        yield f"set_trial/{tag}", lambda: _set_trial(OmegaTuna.create({}), trial)
+
+        yield f"resolve/fixed_trial/{tag}", lambda: OmegaTuna.resolve(
+            OmegaTuna.create(d, trial=trial)
+        )
+
+        template = OmegaTuna.compile(d)
+        yield f"template/instantiate/{tag}", lambda: template.instantiate(trial)
+
+        if n_keys <= MAX_BATCH_KEYS:
+            # One generation of a population-based sampler, built in one call.
+            generation = [trial] * BATCH_SIZE
+            yield f"create/batch{BATCH_SIZE}/{tag}", lambda: OmegaTuna.create_batch(
+                d, generation
+            )
+            yield f"create/dict_trial{BATCH_SIZE}/{tag}", lambda: [
+                OmegaTuna.create(d, trial=t) for t in generation
+            ]
+
+    for n_fields in SCHEMA_FIELDS:
+        cls = make_nested_dataclass_type(n_fields)
+        trial = FixedTrial({f"p{g}": 0.5 for g in range(n_fields // 10)})
+        yield f"structured/schema/{n_fields}", lambda: OmegaTuna.structured(
+            cls, trial=trial
+        )
+        yield f"structured/uncached/{n_fields}", lambda: _set_trial(
+            OmegaTuna._create_impl(obj=cls, parent=None, flags=None), trial
+        )
+
+    conf = OmegaTuna.create(make_dict(10, 1), trial=fixed_trial(1))
+    yield "access/fixed_trial", first_param(conf)
+
+    study = optuna.create_study()
+    conf = OmegaTuna.create(make_dict(10, 1), trial=study.ask())
+    yield "access/study_trial", first_param(conf)
+
+    conf = OmegaTuna.create(make_dict(10, 1))
+    yield "access/plain", lambda: conf.group0.k1
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="run small sizes only")
+    parser.add_argument("--filter", default="", help="run benchmarks containing this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare with the results in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="ratio to the baseline above which a benchmark is a regression",
+    )
+    args = parser.parse_args()
+
+    baseline: Dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results: Dict[str, float] = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sizes = QUICK_SIZES if args.quick else SIZES
+        for name, func in benchmarks(sizes, tmpdir):
+            if args.filter not in name:
+                continue
+            results[name] = t = measure(func, args.repeat)
+            line = f"{name:40s} {t * 1e6:14.2f} us"
+            if name in baseline:
+                ratio = t / baseline[name]
+                line += f"  x{ratio:.2f}"
+                if ratio > args.threshold:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+            print(line, flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) found", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
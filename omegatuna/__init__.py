@@ -14,5 +14,11 @@
 
 from omegaconf import *  # noqa
 
+from .load_cache import disable_load_cache, enable_load_cache  # noqa
 from .omegatuna import OmegaTuna  # noqa
+from .overlay import ConfigOverlay  # noqa
 from .resolvers import register_ot_resolvers  # noqa
+from .result_cache import ResultCache  # noqa
+from .runner import run  # noqa
+from .stats import disable_stats, enable_stats, get_stats  # noqa
+from .template import ConfigTemplate  # noqa
@@ -0,0 +1,218 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import ast
+import operator
+import sys
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from omegaconf import DictConfig
+from omegaconf.errors import (
+    ConfigKeyError,
+    InterpolationKeyError,
+    InterpolationToMissingValueError,
+    MissingMandatoryValue,
+)
+
+from . import stats
+from .omegatuna import _CONSTRAINTS_KEY as CONSTRAINTS_KEY
+
+_USER_ATTR = "omegatuna.constraint_violated"
+
+_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": abs,
+    "len": len,
+    "max": max,
+    "min": min,
+    "round": round,
+}
+
+_BINARY_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.Not: operator.not_,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_COMPARISONS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Constant,
+    ast.List,
+    ast.Tuple,
+    ast.Load,
+    *_BINARY_OPS,
+    *_UNARY_OPS,
+    *_COMPARISONS,
+)
+if sys.version_info < (3, 9):
+    _NODES += (ast.Index,)
+
+
+@lru_cache(maxsize=1024)
+def _parse(expr: str) -> ast.expr:
+    tree = ast.parse(expr.strip(), mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise ValueError(
+                f"Unsupported syntax in the constraint '{expr}': {type(node).__name__}"
+            )
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS
+        ):
+            raise ValueError(
+                f"Only {sorted(_FUNCTIONS)} can be called in the constraint '{expr}'"
+            )
+    return tree.body
+
+
+def _eval(node: ast.expr, conf: DictConfig) -> Any:
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return conf[node.id]
+    if isinstance(node, ast.Attribute):
+        return _eval(node.value, conf)[node.attr]
+    if isinstance(node, ast.Subscript):
+        index = node.slice
+        if sys.version_info < (3, 9):
+            # The index is wrapped in `ast.Index`.
+            index = index.value
+        container: Any = _eval(node.value, conf)
+        return container[_eval(index, conf)]
+    if isinstance(node, ast.BoolOp):
+        if isinstance(node.op, ast.And):
+            return all(_eval(value, conf) for value in node.values)
+        return any(_eval(value, conf) for value in node.values)
+    if isinstance(node, ast.BinOp):
+        return _BINARY_OPS[type(node.op)](
+            _eval(node.left, conf), _eval(node.right, conf)
+        )
+    if isinstance(node, ast.UnaryOp):
+        return _UNARY_OPS[type(node.op)](_eval(node.operand, conf))
+    if isinstance(node, ast.Compare):
+        left = _eval(node.left, conf)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _eval(comparator, conf)
+            if not _COMPARISONS[type(op)](left, right):
+                return False
+            left = right
+        return True
+    if isinstance(node, ast.IfExp):
+        if _eval(node.test, conf):
+            return _eval(node.body, conf)
+        return _eval(node.orelse, conf)
+    if isinstance(node, ast.Call):
+        assert isinstance(node.func, ast.Name)
+        return _FUNCTIONS[node.func.id](*(_eval(arg, conf) for arg in node.args))
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_eval(elt, conf) for elt in node.elts]
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def evaluate(expr: str, conf: DictConfig) -> bool:
+    """Evaluate a constraint expression against a config.
+
+    Names refer to the nodes of `conf`, e.g. `train.batch_size * train.grad_accum <=
+    max_tokens`. Arithmetic, comparisons, boolean operators, constants and the
+    functions `abs`, `len`, `max`, `min` and `round` are supported. Only the nodes
+    used by the expression are resolved.
+    """
+    return bool(_eval(_parse(expr), conf))
+
+
+_UNDEFINED_ERRORS = (
+    ConfigKeyError,
+    InterpolationKeyError,
+    InterpolationToMissingValueError,
+    MissingMandatoryValue,
+)
+
+
+def check_constraints(
+    conf: DictConfig, trial: Optional[Any] = None, partial: bool = False
+) -> None:
+    """Evaluate the constraints of a config and prune `trial` if one is violated.
+
+    The constraints are the items of the `_constraints_` node of `conf`, mapping
+    their names to expressions for `evaluate`. On the first violated constraint,
+    its name is stored in the user attribute `omegatuna.constraint_violated` of
+    `trial` and `optuna.TrialPruned` is raised. If `partial` is True, `conf` is
+    taken as a layer of a config still to be merged, and constraints referring
+    to nodes it does not define, or whose values are missing, are skipped.
+    """
+    constraints = conf.get(CONSTRAINTS_KEY)
+    if not constraints:
+        return
+
+    for name in constraints:
+        try:
+            satisfied = evaluate(constraints[name], conf)
+        except _UNDEFINED_ERRORS:
+            if not partial:
+                raise
+            continue
+        if stats._stats is not None:
+            stats._stats.record_constraint(str(name), not satisfied)
+        if not satisfied:
+            import optuna
+
+            if trial is not None:
+                trial.set_user_attr(_USER_ATTR, str(name))
+            raise optuna.TrialPruned(
+                f"The constraint '{name}' is violated: {constraints[name]}"
+            )
+
+
+def rejection_rates(study: Any) -> Dict[str, float]:
+    """Return the fraction of the trials of a study rejected by each constraint."""
+    trials = study.get_trials(deepcopy=False)
+    if not trials:
+        return {}
+    counts = Counter(
+        t.user_attrs[_USER_ATTR] for t in trials if _USER_ATTR in t.user_attrs
+    )
+    return {name: count / len(trials) for name, count in counts.items()}
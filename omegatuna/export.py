@@ -0,0 +1,212 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+from omegaconf import DictConfig, ListConfig
+
+from .omegatuna import OmegaTuna
+from .overlay import ConfigOverlay
+from .resolvers import NodePath, SuggestSpec, collect_specs
+from .template import ConfigTemplate
+
+if TYPE_CHECKING:
+    from optuna.trial import FrozenTrial
+
+Source = Union[ConfigTemplate, DictConfig, ListConfig]
+
+_MISSING = object()
+Trials = Union[Any, Iterable["FrozenTrial"]]
+
+
+def iter_trials(
+    study: Any, page_size: int = 1000, states: Optional[Iterable[Any]] = None
+) -> Iterator["FrozenTrial"]:
+    """Iterate over the trials of a study in the order of their numbers.
+
+    With RDB storage, trials are read from the database `page_size` at a time, so
+    that the whole study is never held in memory. Other storages keep all the
+    trials in memory anyway and are iterated over directly.
+    """
+    states = None if states is None else tuple(states)
+    backend = getattr(study._storage, "_backend", study._storage)
+    if not hasattr(backend, "scoped_session"):
+        yield from study.get_trials(deepcopy=False, states=states)
+        return
+
+    from optuna.storages._rdb import models
+    from sqlalchemy import orm  # type: ignore
+
+    session = backend.scoped_session()
+    try:
+        query = session.query(models.TrialModel.trial_id).filter(
+            models.TrialModel.study_id == study._study_id
+        )
+        if states is not None:
+            query = query.filter(models.TrialModel.state.in_(states))
+        trial_ids = [row[0] for row in query.order_by(models.TrialModel.number)]
+
+        for start in range(0, len(trial_ids), page_size):
+            page_ids = trial_ids[start : start + page_size]  # noqa: E203
+            page = (
+                session.query(models.TrialModel)
+                .options(orm.selectinload(models.TrialModel.params))
+                .options(orm.selectinload(models.TrialModel.values))
+                .options(orm.selectinload(models.TrialModel.user_attributes))
+                .options(orm.selectinload(models.TrialModel.system_attributes))
+                .options(orm.selectinload(models.TrialModel.intermediate_values))
+                .filter(models.TrialModel.trial_id.in_(page_ids))
+                .order_by(models.TrialModel.number)
+                .all()
+            )
+            trials = [backend._build_frozen_trial_from_trial_model(t) for t in page]
+            session.expunge_all()
+            yield from trials
+    finally:
+        session.close()
+
+
+def _base(source: Source) -> Union[DictConfig, ListConfig]:
+    return source.config if isinstance(source, ConfigTemplate) else source
+
+
+def _specs(source: Source) -> Dict[NodePath, SuggestSpec]:
+    if isinstance(source, ConfigTemplate):
+        return source.specs
+    return collect_specs(source)
+
+
+def _trials(trials: Trials) -> Iterable["FrozenTrial"]:
+    return iter_trials(trials) if hasattr(trials, "get_trials") else trials
+
+
+def export_jsonl(source: Source, trials: Trials, path: str) -> int:
+    """Write the resolved config of each trial to a JSON-lines file.
+
+    `source` is a config without a trial, or a template of it, and `trials` is a
+    study or an iterable of `FrozenTrial`. Each line holds the number, the state,
+    the values and the parameters of a trial, and its config resolved with
+    `OmegaTuna.overlay`; parameters the trial does not have take their default
+    values or None. Trials are processed one at a time. Returns the number of lines
+    written.
+    """
+    base = _base(source)
+    # Parameters a trial does not have, e.g. because it failed before suggesting
+    # them, take their default values or None.
+    defaults = {
+        spec.name: spec.default if spec.has_default else None
+        for spec in _specs(source).values()
+    }
+    n = 0
+    with open(path, "w") as f:
+        for trial in _trials(trials):
+            params = {**defaults, **trial.params}
+            record = {
+                "number": trial.number,
+                "state": trial.state.name,
+                "values": trial.values,
+                "params": trial.params,
+                "config": OmegaTuna.to_container(
+                    ConfigOverlay(base, params), resolve=True
+                ),
+            }
+            f.write(json.dumps(record, default=str) + "\n")
+            n += 1
+    return n
+
+
+def _column_dtype(spec: SuggestSpec) -> np.dtype:
+    if spec.resolver == "ot.categorical":
+        width = max((len(str(c)) for c in spec.kwargs["choices"]), default=1)
+        return np.dtype(f"<U{max(width, 1)}")
+    return np.dtype("float64")
+
+
+def _column_name(path: NodePath) -> str:
+    return ".".join(str(key) for key in path)
+
+
+def export_npz(source: Source, trials: Trials, path: str) -> int:
+    """Write the parameters of each trial to an `.npz` file, one column per node.
+
+    Columns are named by the dotted paths of the `ot.*` nodes of `source`, plus
+    `number` and `value` (`values_<i>` for multi-objective studies). Numeric
+    parameters are stored as float64 and categorical ones as strings; parameters
+    a trial does not have are NaN or empty. Columns are streamed through
+    temporary files, so memory use does not depend on the number of trials.
+    Returns the number of rows written.
+    """
+    specs = _specs(source)
+    n_values = len(trials.directions) if hasattr(trials, "directions") else 1
+    value_names = (
+        ["value"] if n_values == 1 else [f"values_{i}" for i in range(n_values)]
+    )
+
+    dtypes: Dict[str, np.dtype] = {"number": np.dtype("int64")}
+    dtypes.update((name, np.dtype("float64")) for name in value_names)
+    params: Dict[str, str] = {}
+    for node_path, spec in specs.items():
+        name = _column_name(node_path)
+        dtypes[name] = _column_dtype(spec)
+        params[name] = spec.name
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = {
+            name: open(os.path.join(tmpdir, str(i)), "wb")
+            for i, name in enumerate(dtypes)
+        }
+        n = 0
+        try:
+            for trial in _trials(trials):
+                values: List[Optional[float]] = list(trial.values or [])
+                values += [None] * (n_values - len(values))
+                row: Dict[str, Any] = {"number": trial.number}
+                row.update(zip(value_names, values))
+                for name, param in params.items():
+                    row[name] = trial.params.get(param, _MISSING)
+                for name, dtype in dtypes.items():
+                    files[name].write(_to_bytes(row[name], dtype))
+                n += 1
+        finally:
+            for f in files.values():
+                f.close()
+
+        with zipfile.ZipFile(path, "w", allowZip64=True) as zf:
+            for i, (name, dtype) in enumerate(dtypes.items()):
+                with zf.open(f"{name}.npy", "w", force_zip64=True) as member:
+                    np.lib.format.write_array_header_1_0(
+                        member,
+                        {
+                            "descr": np.lib.format.dtype_to_descr(dtype),
+                            "fortran_order": False,
+                            "shape": (n,),
+                        },
+                    )
+                    with open(os.path.join(tmpdir, str(i)), "rb") as src:
+                        shutil.copyfileobj(src, member)
+    return n
+
+
+def _to_bytes(value: Any, dtype: np.dtype) -> bytes:
+    if dtype.kind == "U":
+        return np.array("" if value is _MISSING else str(value), dtype=dtype).tobytes()
+    if value is None or value is _MISSING:
+        value = np.nan
+    return np.array(value, dtype=dtype).tobytes()
@@ -0,0 +1,103 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from .omegatuna import CacheInfo
+
+Config = Union[DictConfig, ListConfig]
+_Key = Tuple[str, int, int]
+
+
+class LoadCache:
+    """LRU cache of configs parsed from YAML files.
+
+    Entries are keyed by the resolved path, the modification time and the size of
+    a file, so that a modified file is parsed again. `load` returns a deep copy of
+    the cached config, which is never bound to a trial.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, Config]" = OrderedDict()
+
+    @staticmethod
+    def _key(path: Union[str, "os.PathLike[str]"]) -> _Key:
+        resolved = os.path.realpath(path)
+        st = os.stat(resolved)
+        return resolved, st.st_mtime_ns, st.st_size
+
+    def load(self, path: Union[str, "os.PathLike[str]"]) -> Config:
+        key = self._key(path)
+        with self._lock:
+            conf = self._entries.get(key)
+            if conf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if conf is None:
+            conf = OmegaConf.load(key[0])
+            with self._lock:
+                self.misses += 1
+                self._evict(key[0])
+                self._entries[key] = conf
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return copy.deepcopy(conf)
+
+    def _evict(self, resolved: str) -> None:
+        for key in [key for key in self._entries if key[0] == resolved]:
+            del self._entries[key]
+
+    def invalidate(self, path: Optional[Union[str, "os.PathLike[str]"]] = None) -> None:
+        """Discard the entries of `path`, or all the entries if `path` is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._evict(os.path.realpath(path))
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, len(self._entries))
+
+
+_load_cache: Optional[LoadCache] = None
+
+
+def enable_load_cache(maxsize: int = 128) -> LoadCache:
+    """Make `OmegaTuna.load` cache parsed files and return the cache."""
+    global _load_cache
+    if _load_cache is None or _load_cache.maxsize != maxsize:
+        _load_cache = LoadCache(maxsize)
+    return _load_cache
+
+
+def disable_load_cache() -> None:
+    global _load_cache
+    _load_cache = None
+
+
+def get_load_cache() -> Optional[LoadCache]:
+    return _load_cache
@@ -0,0 +1,91 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import copy
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
+
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from .omegatuna import (
+    OmegaTuna,
+    _check_constraints,
+    _get_trial,
+    _get_trial_or_raise,
+    _set_trial,
+)
+
+if TYPE_CHECKING:
+    from optuna.trial import BaseTrial
+
+Config = Union[DictConfig, ListConfig]
+
+
+class MergeStack:
+    """Configs merged once, in order, to be reused by every trial.
+
+    The layers must not have trials bound to them. The merged config is read-only
+    and shared; `merge` returns a copy with trial-dependent layers merged on top,
+    and `bind` resolves the shared config against a trial without copying it.
+    """
+
+    def __init__(self, *layers: Any) -> None:
+        for layer in layers:
+            if isinstance(layer, (DictConfig, ListConfig)) and _get_trial(layer):
+                raise ValueError("layers of a merge stack must not have a trial bound")
+
+        self._merged: Config = OmegaConf.merge(*layers)
+        OmegaConf.set_readonly(self._merged, True)
+
+    @property
+    def config(self) -> Config:
+        """The shared merged config, without a trial."""
+        return self._merged
+
+    def merge(
+        self, *layers: Any, trial: Optional["BaseTrial"] = None, eager: bool = False
+    ) -> Config:
+        """Return a copy of the merged config with `layers` merged on top of it.
+
+        The trial is `trial`, or else the one bound to `layers` as in
+        `OmegaTuna.merge`.
+        """
+        confs = [cfg for cfg in layers if isinstance(cfg, (DictConfig, ListConfig))]
+        if trial is None and confs:
+            try:
+                trial = _get_trial_or_raise(confs)
+            except Exception:
+                raise RuntimeError(
+                    "Trial instances bound to Config objects to merged must be "
+                    "identical"
+                )
+
+        if layers:
+            conf = OmegaConf.merge(self._merged, *layers)
+        else:
+            conf = copy.deepcopy(self._merged)
+        OmegaConf.set_readonly(conf, None)
+        return _set_trial(conf, trial, eager, complete=True)
+
+    @contextmanager
+    def bind(self, trial: "BaseTrial") -> Iterator[Config]:
+        """Yield the shared merged config, resolved against `trial` in this context.
+
+        This is `OmegaTuna.use_trial` applied to `config`, so its cost does not
+        depend on the size of the config. The constraints of `config` are checked
+        on entry.
+        """
+        with OmegaTuna.use_trial(trial):
+            _check_constraints(self._merged, trial)
+            yield self._merged
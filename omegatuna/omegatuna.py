@@ -12,31 +12,126 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import dataclasses
 import pathlib
-from typing import IO, Any, Dict, List, Optional, Sequence, Tuple, Union, overload
+import pickle
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
 
 from omegaconf.omegaconf import (
     _DEFAULT_MARKER_,
     BaseContainer,
+    Container,
     DictConfig,
     DictKeyType,
     ListConfig,
     OmegaConf,
 )
-from optuna.trial import BaseTrial
+
+from .stats import timed
+
+if TYPE_CHECKING:
+    import numpy as np
+    from optuna.distributions import BaseDistribution
+    from optuna.trial import BaseTrial, FrozenTrial
+
+    from .merge_stack import MergeStack
+    from .overlay import ConfigOverlay
+    from .template import ConfigTemplate
+    from .warm_start import WarmStartInfo
 
 _TRIAL_KEY = "_optuna_trial"
+_CACHE_KEY = "_optuna_param_cache"
+_RESOLVED_KEY = "_optuna_resolved"
+_CONSTRAINTS_KEY = "_constraints_"
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+
+
+class ParamCache:
+    """Values suggested by the trial bound to a config, keyed by parameter name."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self.values))
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# A trial bound to the current context by `OmegaTuna.use_trial`. It takes
+# precedence over the trial bound to the root node of a config.
+_context_binding: "ContextVar[Optional[Tuple[BaseTrial, ParamCache]]]" = ContextVar(
+    "_context_binding", default=None
+)
+
+
+# Pickled schemas of the types passed to `OmegaTuna.structured`, so that their
+# fields are introspected once per type. A pickle refers to its type by name only,
+# so the entry of a type is dropped with it. Types whose schemas cannot be pickled,
+# e.g. local dataclasses, and types whose defaults may differ between calls are
+# mapped to None.
+_structured_snapshots: "weakref.WeakKeyDictionary[type, Optional[bytes]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 class OmegaTuna(OmegaConf):
     @staticmethod
+    @timed("create")
     def structured(
         obj: Any,
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> Any:
-        return OmegaTuna.create(obj, parent, flags, trial=trial)
+        """`OmegaConf.structured` that binds `trial` to the config.
+
+        The schema generated from a dataclass type is cached per type, so later
+        calls only copy it. Types with a `default_factory` other than a nested
+        dataclass or an empty `list`, `dict`, `set` or `tuple`, whose defaults may
+        change between calls, are not cached. Neither are instances, attr classes,
+        or calls with `parent` or `flags`.
+        """
+        if (
+            parent is None
+            and flags is None
+            and isinstance(obj, type)
+            and dataclasses.is_dataclass(obj)
+        ):
+            conf = _structured_schema(obj)
+        else:
+            conf = OmegaTuna._create_impl(obj=obj, parent=parent, flags=flags)
+        return _set_trial(conf, trial, eager)
 
     @staticmethod
     @overload
@@ -44,7 +139,8 @@ class OmegaTuna(OmegaConf):
         obj: str,
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> Union[DictConfig, ListConfig]:
         ...
 
@@ -54,7 +150,8 @@ class OmegaTuna(OmegaConf):
         obj: Union[List[Any], Tuple[Any, ...]],
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> ListConfig:
         ...
 
@@ -64,7 +161,8 @@ class OmegaTuna(OmegaConf):
         obj: DictConfig,
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> DictConfig:
         ...
 
@@ -74,7 +172,8 @@ class OmegaTuna(OmegaConf):
         obj: ListConfig,
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> ListConfig:
         ...
 
@@ -84,42 +183,57 @@ class OmegaTuna(OmegaConf):
         obj: Optional[Dict[Any, Any]] = None,
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> DictConfig:
         ...
 
     @staticmethod
+    @timed("create")
     def create(  # noqa F811 # type: ignore
         obj: Any = _DEFAULT_MARKER_,
         parent: Optional[BaseContainer] = None,
         flags: Optional[Dict[str, bool]] = None,
-        trial: Optional[BaseTrial] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ):
         conf = OmegaTuna._create_impl(obj=obj, parent=parent, flags=flags)
-        return _set_trial(conf, trial)
+        return _set_trial(conf, trial, eager)
 
     @staticmethod
+    @timed("load")
     def load(
-        file_: Union[str, pathlib.Path, IO[Any]], trial: Optional[BaseTrial] = None
+        file_: Union[str, pathlib.Path, IO[Any]],
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> Union[DictConfig, ListConfig]:
-        conf = OmegaConf.load(file_)
-        return _set_trial(conf, trial)
+        from . import load_cache
+
+        cache = load_cache._load_cache
+        if cache is not None and isinstance(file_, (str, pathlib.Path)):
+            conf = cache.load(file_)
+        else:
+            conf = OmegaConf.load(file_)
+        return _set_trial(conf, trial, eager)
 
     @staticmethod
     def from_cli(
-        args_list: Optional[List[str]] = None, trial: Optional[BaseTrial] = None
+        args_list: Optional[List[str]] = None,
+        trial: Optional["BaseTrial"] = None,
+        eager: bool = False,
     ) -> DictConfig:
         conf = OmegaConf.from_cli(args_list)
-        return _set_trial(conf, trial)
+        return _set_trial(conf, trial, eager)
 
     @staticmethod
     def from_dotlist(
-        dotlist: List[str], trial: Optional[BaseTrial] = None
+        dotlist: List[str], trial: Optional["BaseTrial"] = None, eager: bool = False
     ) -> DictConfig:
         conf = OmegaConf.from_dotlist(dotlist)
-        return _set_trial(conf, trial)
+        return _set_trial(conf, trial, eager)
 
     @staticmethod
+    @timed("merge")
     def merge(
         *configs: Union[
             DictConfig,
@@ -129,6 +243,7 @@ class OmegaTuna(OmegaConf):
             Tuple[Any, ...],
             Any,
         ],
+        eager: bool = False,
     ) -> Union[ListConfig, DictConfig]:
         try:
             trial = _get_trial_or_raise(
@@ -140,21 +255,261 @@ class OmegaTuna(OmegaConf):
             )
 
         merged = OmegaConf.merge(*configs)
-        return _set_trial(merged, trial)
+        return _set_trial(merged, trial, eager, complete=True)
+
+    @staticmethod
+    def rebind(
+        conf: Union[DictConfig, ListConfig], trial: Optional["BaseTrial"]
+    ) -> Union[DictConfig, ListConfig]:
+        """Bind `trial` to `conf` in place of the trial already bound to it.
+
+        Only the cached parameter values are discarded; the config itself is reused.
+        Passing `None` unbinds the trial. Configs whose parameters have already been
+        resolved, e.g. with `eager=True`, cannot be rebound.
+        """
+        if _is_resolved(conf):
+            raise ValueError("cannot rebind a config whose parameters are resolved")
+
+        for key in (_TRIAL_KEY, _CACHE_KEY):
+            try:
+                object.__delattr__(conf, key)
+            except AttributeError:
+                pass
+
+        return _set_trial(conf, trial)
+
+    @staticmethod
+    @contextmanager
+    def use_trial(trial: "BaseTrial") -> Iterator[ParamCache]:
+        """Bind `trial` to every config resolved in the current context.
+
+        The binding is stored in a context variable, so that a single config can be
+        shared by concurrent threads or asyncio tasks, each resolving it against its
+        own trial. It takes precedence over a trial bound to the config itself.
+        Yields the parameter cache of the binding. As no config is given, the
+        constraints are not checked; call
+        `omegatuna.constraints.check_constraints(conf, trial)` in the context.
+        """
+        cache = ParamCache()
+        token = _context_binding.set((trial, cache))
+        try:
+            yield cache
+        finally:
+            _context_binding.reset(token)
+
+    @staticmethod
+    def compile(obj: Any) -> "ConfigTemplate":
+        """Parse a config once and return a template to instantiate per trial.
+
+        `obj` is a config object or anything `OmegaTuna.create` accepts.
+        """
+        from .template import ConfigTemplate
+
+        if not isinstance(obj, (DictConfig, ListConfig)):
+            obj = OmegaConf.create(obj)
+        return ConfigTemplate(obj)
+
+    @staticmethod
+    def create_batch(
+        obj: Any, trials: Iterable["BaseTrial"]
+    ) -> List[Optional[Union[DictConfig, ListConfig]]]:
+        """Create a config bound to each of `trials` from a single source.
+
+        `obj` is parsed once, as by `OmegaTuna.compile`, unless it is already a
+        `ConfigTemplate`. Trials rejected by constraints get None.
+        """
+        from .template import ConfigTemplate
+
+        template = obj if isinstance(obj, ConfigTemplate) else OmegaTuna.compile(obj)
+        return template.instantiate_batch(trials)
+
+    @staticmethod
+    def from_frozen_trials(
+        obj: Any, trials: Iterable["FrozenTrial"], strict: bool = False
+    ) -> List[Union[DictConfig, ListConfig]]:
+        """Rebuild the configs of finished trials from their stored parameters.
+
+        `obj` is parsed once, as by `OmegaTuna.create_batch`. See
+        `ConfigTemplate.instantiate_frozen` for how mismatches are reported.
+        """
+        from .template import ConfigTemplate
+
+        template = obj if isinstance(obj, ConfigTemplate) else OmegaTuna.compile(obj)
+        return [template.instantiate_frozen(trial, strict) for trial in trials]
+
+    @staticmethod
+    def merge_stack(*configs: Any) -> "MergeStack":
+        """Merge configs once and return a stack to merge per trial.
+
+        See `omegatuna.merge_stack.MergeStack`.
+        """
+        from .merge_stack import MergeStack
+
+        return MergeStack(*configs)
+
+    @staticmethod
+    def overlay(
+        base: Union[DictConfig, ListConfig], params: Union[Mapping[str, Any], Any]
+    ) -> "ConfigOverlay":
+        """Return a read-only view of `base` with the given parameter values.
+
+        `params` is a dict of parameter values or a trial, typically a
+        `FrozenTrial`, whose `params` are used. `base` must not have a trial bound
+        to it and is shared, not copied, so that many overlays of one base cost
+        little more than their parameter values. The parameters are those of a
+        finished trial, so the constraints of `base` are not checked.
+        """
+        from .overlay import ConfigOverlay
+
+        if _get_trial(base) is not None:
+            raise ValueError("cannot overlay a config that has a trial bound to it")
+        if not isinstance(params, Mapping):
+            params = params.params
+        return ConfigOverlay(base, params)
+
+    @staticmethod
+    def resolve(cfg: Container) -> None:
+        """`OmegaConf.resolve` that suggests only the branches selected by `ot.switch`.
+
+        The nodes of branches that are not selected are left unresolved. The
+        `ot.budget` nodes are kept, as they change while the trial runs. A config
+        resolved against a trial holds its values, so it cannot be rebound.
+        """
+        from .resolvers import keep_budgets, resolve_active
+
+        if not isinstance(cfg, (DictConfig, ListConfig)):
+            OmegaConf.resolve(cfg)
+            return
+        root = cast(Union[DictConfig, ListConfig], cfg._get_root())
+        with keep_budgets(cfg):
+            resolve_active(cfg)
+        if _get_binding(root)[0] is not None:
+            _mark_resolved(root)
+
+    @staticmethod
+    def to_container(cfg: Any, **kwargs: Any) -> Any:
+        """`OmegaConf.to_container` that also accepts overlays.
+
+        With `resolve=True`, only the branches selected by `ot.switch` are suggested,
+        as in `OmegaTuna.resolve`, and the other branches are left unresolved.
+        """
+        from .overlay import ConfigOverlay
+
+        if isinstance(cfg, ConfigOverlay):
+            return cfg.to_container(**kwargs)
+        if kwargs.get("resolve", False) and _has_switches(cfg):
+            from .resolvers import resolved_copy
+
+            return OmegaConf.to_container(
+                resolved_copy(cfg), **{**kwargs, "resolve": False}
+            )
+        return OmegaConf.to_container(cfg, **kwargs)
+
+    @staticmethod
+    def to_yaml(cfg: Any, **kwargs: Any) -> str:
+        """`OmegaConf.to_yaml` that also accepts overlays.
+
+        With `resolve=True`, only the branches selected by `ot.switch` are suggested.
+        """
+        from .overlay import ConfigOverlay
+
+        if isinstance(cfg, ConfigOverlay):
+            return cfg.to_yaml(**kwargs)
+        if kwargs.get("resolve", False) and _has_switches(cfg):
+            from .resolvers import resolved_copy
+
+            return OmegaConf.to_yaml(resolved_copy(cfg), **{**kwargs, "resolve": False})
+        return OmegaConf.to_yaml(cfg, **kwargs)
+
+    @staticmethod
+    def search_space(
+        conf: Union[DictConfig, ListConfig]
+    ) -> Tuple[Dict[str, "BaseDistribution"], Dict[str, Any]]:
+        """Return the search space of a config without running a trial.
+
+        The first item maps each parameter name to its Optuna distribution and
+        the second maps parameter names to their default values, if given.
+        Parameters whose arguments refer to other nodes have no distribution.
+        """
+        from .resolvers import search_space
+
+        return search_space(conf)
+
+    @staticmethod
+    def warm_start(
+        study: Any,
+        conf: Union[DictConfig, ListConfig],
+        trials: Union[Any, Iterable["FrozenTrial"]] = (),
+        enqueue_defaults: bool = False,
+    ) -> "WarmStartInfo":
+        """Seed `study` with prior trials mapped onto the search space of `conf`.
+
+        See `omegatuna.warm_start.warm_start`.
+        """
+        from .warm_start import warm_start
+
+        return warm_start(study, conf, trials, enqueue_defaults)
+
+    @staticmethod
+    def sample(
+        conf: Union[DictConfig, ListConfig],
+        n: int,
+        method: str = "random",
+        seed: Optional[int] = None,
+    ) -> Dict[str, "np.ndarray"]:
+        """Draw `n` values of every parameter without Optuna trials.
+
+        See `omegatuna.sampling.sample` for the available methods.
+        """
+        from .sampling import sample
+
+        return sample(conf, n, method, seed)
+
+    @staticmethod
+    def cache_info(conf: Union[DictConfig, ListConfig]) -> CacheInfo:
+        """Return hit/miss counters of the parameter cache of a trial-bound config."""
+        cache = _get_param_cache(conf)
+        if cache is None:
+            return CacheInfo(0, 0, 0)
+        return cache.info()
+
+
+def _check_constraints(
+    conf: Union[DictConfig, ListConfig],
+    trial: Optional["BaseTrial"],
+    partial: bool = False,
+) -> None:
+    if isinstance(conf, DictConfig) and _CONSTRAINTS_KEY in conf:
+        from .constraints import check_constraints
+
+        check_constraints(conf, trial, partial)
 
 
 @overload
-def _set_trial(conf: DictConfig, trial: Optional[BaseTrial]) -> DictConfig:
+def _set_trial(
+    conf: DictConfig,
+    trial: Optional["BaseTrial"],
+    eager: bool = False,
+    complete: bool = False,
+) -> DictConfig:
     ...
 
 
 @overload
-def _set_trial(conf: ListConfig, trial: Optional[BaseTrial]) -> ListConfig:
+def _set_trial(
+    conf: ListConfig,
+    trial: Optional["BaseTrial"],
+    eager: bool = False,
+    complete: bool = False,
+) -> ListConfig:
     ...
 
 
 def _set_trial(
-    conf: Union[DictConfig, ListConfig], trial: Optional[BaseTrial]
+    conf: Union[DictConfig, ListConfig],
+    trial: Optional["BaseTrial"],
+    eager: bool = False,
+    complete: bool = False,
 ) -> Union[DictConfig, ListConfig]:
     try:
         org_trial = object.__getattribute__(conf, _TRIAL_KEY)
@@ -165,12 +520,33 @@ def _set_trial(
             raise RuntimeError("cannot set a trial if one has already been set")
 
     if trial:
-        object.__setattr__(conf, _TRIAL_KEY, trial)
+        _bind_trial(conf, trial)
+        # A config that is not `complete` may be a layer to be merged with others,
+        # which can define the nodes its constraints refer to.
+        _check_constraints(conf, trial, partial=not complete)
+
+    if eager:
+        # Resolve all the interpolations now so that every `trial.suggest_*` call
+        # happens here and later reads do not go through the resolvers.
+        if trial:
+            from .resolvers import suggest_all
+
+            suggest_all(conf)
+        OmegaTuna.resolve(conf)
+        _mark_resolved(conf)
 
     return conf
 
 
-def _get_trial(conf: Union[DictConfig, ListConfig]) -> Optional[BaseTrial]:
+def _bind_trial(conf: Union[DictConfig, ListConfig], trial: "BaseTrial") -> ParamCache:
+    # Attach a trial and a new parameter cache, without checking constraints.
+    cache = ParamCache()
+    object.__setattr__(conf, _TRIAL_KEY, trial)
+    object.__setattr__(conf, _CACHE_KEY, cache)
+    return cache
+
+
+def _get_trial(conf: Union[DictConfig, ListConfig]) -> Optional["BaseTrial"]:
     try:
         trial = object.__getattribute__(conf, _TRIAL_KEY)
     except AttributeError:
@@ -179,9 +555,80 @@ def _get_trial(conf: Union[DictConfig, ListConfig]) -> Optional[BaseTrial]:
     return trial
 
 
+def _structured_schema(obj: type) -> Union[DictConfig, ListConfig]:
+    snapshot = _structured_snapshots.get(obj)
+    if snapshot is not None:
+        conf = pickle.loads(snapshot)
+        # A type redefined under the same name is unpickled as the new type.
+        if OmegaConf.get_type(conf) is obj:
+            return conf
+
+    conf = OmegaTuna._create_impl(obj=obj, parent=None, flags=None)
+    if obj not in _structured_snapshots:
+        snapshot = None
+        if _has_fixed_defaults(obj):
+            try:
+                snapshot = pickle.dumps(conf, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                pass
+        _structured_snapshots[obj] = snapshot
+    return conf
+
+
+def _has_fixed_defaults(cls: type) -> bool:
+    # Whether a dataclass has the same defaults on each instantiation. Factories
+    # such as counters or timestamps must run on each call.
+    for f in dataclasses.fields(cls):
+        factory: Any = f.default_factory
+        if factory is dataclasses.MISSING or factory in (list, dict, set, tuple):
+            continue
+        if not (
+            isinstance(factory, type)
+            and dataclasses.is_dataclass(factory)
+            and _has_fixed_defaults(factory)
+        ):
+            return False
+    return True
+
+
+def _has_switches(cfg: Any) -> bool:
+    from .resolvers import collect_switches
+
+    return isinstance(cfg, (DictConfig, ListConfig)) and bool(collect_switches(cfg))
+
+
+def _mark_resolved(conf: Union[DictConfig, ListConfig]) -> None:
+    object.__setattr__(conf, _RESOLVED_KEY, True)
+
+
+def _is_resolved(conf: Union[DictConfig, ListConfig]) -> bool:
+    try:
+        return bool(object.__getattribute__(conf, _RESOLVED_KEY))
+    except AttributeError:
+        return False
+
+
+def _get_param_cache(conf: Union[DictConfig, ListConfig]) -> Optional[ParamCache]:
+    try:
+        cache = object.__getattribute__(conf, _CACHE_KEY)
+    except AttributeError:
+        return None
+
+    return cache
+
+
+def _get_binding(
+    conf: Union[DictConfig, ListConfig]
+) -> Tuple[Optional["BaseTrial"], Optional[ParamCache]]:
+    binding = _context_binding.get()
+    if binding is not None:
+        return binding
+    return _get_trial(conf), _get_param_cache(conf)
+
+
 def _get_trial_or_raise(
     confs: Sequence[Union[DictConfig, ListConfig]]
-) -> Optional[BaseTrial]:
+) -> Optional["BaseTrial"]:
     trial = _get_trial(confs[0])
     for cfg in confs[1:]:
         tmp_trial = _get_trial(cfg)
@@ -0,0 +1,145 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Tuple, Union
+
+from omegaconf import DictConfig, ListConfig
+
+from .omegatuna import OmegaTuna, ParamCache, _context_binding
+
+
+class _ParamsTrial:
+    """Trial-like object answering `suggest_*` calls from fixed parameters."""
+
+    def __init__(self, params: Mapping[str, Any]) -> None:
+        self.params = params
+
+    def __getattr__(self, name: str) -> Any:
+        if not name.startswith("suggest_"):
+            raise AttributeError(name)
+
+        def suggest(param_name: str, *args: Any, **kwargs: Any) -> Any:
+            try:
+                return self.params[param_name]
+            except KeyError:
+                raise ValueError(
+                    f"The value of the parameter '{param_name}' is not given"
+                )
+
+        return suggest
+
+
+class ConfigOverlay:
+    """Read-only view of a shared config with the parameter values of one trial.
+
+    The base config is shared by all the overlays created from it and never
+    copied, so an overlay costs only its dict of parameter values. Reading a
+    value resolves the base config against those parameters. Nested containers
+    are returned as overlays as well.
+
+    Use `OmegaTuna.to_container` and `OmegaTuna.to_yaml` to serialize overlays.
+    """
+
+    __slots__ = ("_base", "_binding")
+
+    def __init__(
+        self,
+        base: Union[DictConfig, ListConfig],
+        params: Mapping[str, Any],
+    ) -> None:
+        cache = ParamCache()
+        cache.values = params if isinstance(params, dict) else dict(params)
+        object.__setattr__(self, "_base", base)
+        object.__setattr__(self, "_binding", (_ParamsTrial(cache.values), cache))
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self._binding[1].values
+
+    @contextmanager
+    def _bound(self) -> Iterator[None]:
+        token = _context_binding.set(self._binding)
+        try:
+            yield
+        finally:
+            _context_binding.reset(token)
+
+    def _wrap(self, value: Any) -> Any:
+        if isinstance(value, (DictConfig, ListConfig)):
+            overlay = object.__new__(ConfigOverlay)
+            object.__setattr__(overlay, "_base", value)
+            object.__setattr__(overlay, "_binding", self._binding)
+            return overlay
+        return value
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._bound():
+            return self._wrap(self._base[key])
+
+    def __getattr__(self, key: str) -> Any:
+        if key.startswith("__"):
+            raise AttributeError(key)
+        with self._bound():
+            return self._wrap(getattr(self._base, key))
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise TypeError("ConfigOverlay is read-only")
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        raise TypeError("ConfigOverlay is read-only")
+
+    def get(self, key: Any, default_value: Any = None) -> Any:
+        with self._bound():
+            return self._wrap(self._base.get(key, default_value))
+
+    def __contains__(self, key: Any) -> bool:
+        with self._bound():
+            return key in self._base
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    def __iter__(self) -> Iterator[Any]:
+        if isinstance(self._base, DictConfig):
+            return iter(list(self._base.keys()))
+        return iter([self[i] for i in range(len(self._base))])
+
+    def keys(self) -> Any:
+        return self._base.keys()
+
+    def values(self) -> Any:
+        return [self[key] for key in self._base.keys()]
+
+    def items(self) -> Any:
+        return [(key, self[key]) for key in self._base.keys()]
+
+    def to_container(self, **kwargs: Any) -> Any:
+        with self._bound():
+            return OmegaTuna.to_container(self._base, **kwargs)
+
+    def to_yaml(self, **kwargs: Any) -> str:
+        with self._bound():
+            return OmegaTuna.to_yaml(self._base, **kwargs)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ConfigOverlay):
+            other = other.to_container(resolve=True)
+        return bool(self.to_container(resolve=True) == other)
+
+    def __repr__(self) -> str:
+        return f"ConfigOverlay({self.to_container(resolve=True)!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return ConfigOverlay, (self._base, self.params)
@@ -12,12 +12,51 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from functools import partial
-from typing import Any
+import copy
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
-from omegaconf import Node
+from omegaconf import (
+    MISSING,
+    DictConfig,
+    ListConfig,
+    Node,
+    OmegaConf,
+    ValueNode,
+    read_write,
+)
+from omegaconf.errors import InterpolationToMissingValueError
+from omegaconf.grammar_parser import parse
+from omegaconf.grammar_visitor import GrammarVisitor
 
-from .omegatuna import OmegaTuna
+from . import stats
+from .omegatuna import OmegaTuna, ParamCache, _context_binding, _get_binding
+
+if TYPE_CHECKING:
+    from optuna.distributions import BaseDistribution
+    from optuna.study import Study
 
 SUGGEST_METHODS = {
     "ot.categorical": "suggest_categorical",
@@ -29,28 +68,801 @@ SUGGEST_METHODS = {
 }
 
 
-def _suggest(resolver_name: str, *args, _root_: Node, _node_: Node) -> Any:
-    if len(args) == 2:
-        name, kwargs = args
-    elif len(args) == 1:
-        name = str(_node_._key())
-        kwargs = args[0]
-    try:
-        trial = object.__getattribute__(_root_, "_optuna_trial")
-    except AttributeError:
-        if "default" in kwargs:
-            return kwargs["default"]
+# Optuna is imported only when a distribution is actually constructed, so that
+# configs can be used with their default values without importing Optuna.
+
+
+def _categorical(choices: Sequence[Any]) -> "BaseDistribution":
+    from optuna.distributions import CategoricalDistribution
+
+    return CategoricalDistribution(tuple(choices))
+
+
+def _discrete_uniform(low: float, high: float, q: float) -> "BaseDistribution":
+    from optuna.distributions import DiscreteUniformDistribution
+
+    return DiscreteUniformDistribution(low=low, high=high, q=q)
+
+
+def _float(
+    low: float, high: float, step: Optional[float] = None, log: bool = False
+) -> "BaseDistribution":
+    if step is not None:
+        if log:
+            raise ValueError(
+                "The parameter `step` is not supported when `log` is True."
+            )
+        return _discrete_uniform(low, high, step)
+    if log:
+        return _loguniform(low, high)
+    return _uniform(low, high)
+
+
+def _int(low: int, high: int, step: int = 1, log: bool = False) -> "BaseDistribution":
+    from optuna.distributions import IntLogUniformDistribution, IntUniformDistribution
+
+    if log:
+        if step != 1:
+            raise ValueError(
+                "The parameter `step != 1` is not supported when `log` is True."
+            )
+        return IntLogUniformDistribution(low=low, high=high)
+    return IntUniformDistribution(low=low, high=high, step=step)
+
+
+def _loguniform(low: float, high: float) -> "BaseDistribution":
+    from optuna.distributions import LogUniformDistribution
+
+    return LogUniformDistribution(low=low, high=high)
+
+
+def _uniform(low: float, high: float) -> "BaseDistribution":
+    from optuna.distributions import UniformDistribution
+
+    return UniformDistribution(low=low, high=high)
+
+
+# Distributions corresponding to `SUGGEST_METHODS`, constructed from the same
+# keyword arguments as `trial.suggest_*`.
+DISTRIBUTIONS: Dict[str, Callable[..., "BaseDistribution"]] = {
+    "ot.categorical": _categorical,
+    "ot.discrete_uniform": _discrete_uniform,
+    "ot.float": _float,
+    "ot.int": _int,
+    "ot.loguniform": _loguniform,
+    "ot.uniform": _uniform,
+}
+
+NodePath = Tuple[Union[str, int], ...]
+
+_NO_DEFAULT = object()
+
+# Set while `collect_specs` walks a config, so that resolvers record their
+# arguments instead of suggesting.
+_spec_recorder: ContextVar[Optional[List[Tuple[Node, "SuggestSpec"]]]] = ContextVar(
+    "_spec_recorder", default=None
+)
+
+
+# Set while `_select_branches` resolves `ot.switch` nodes, so that the resolver
+# records the branch it selects.
+_switch_recorder: ContextVar[Optional[List[Tuple[Node, Any]]]] = ContextVar(
+    "_switch_recorder", default=None
+)
+
+
+@dataclass(frozen=True)
+class SuggestSpec:
+    """Parsed arguments of an `ot.*` interpolation.
+
+    The arguments of a `dependent` spec refer to other nodes. They were resolved
+    with placeholder values, so only the node resolved against a trial gives its
+    actual distribution.
+    """
+
+    resolver: str
+    name: str
+    kwargs: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    default: Any = _NO_DEFAULT
+    dependent: bool = False
+
+    @staticmethod
+    def from_args(resolver: str, args: Tuple[Any, ...], key: str) -> "SuggestSpec":
+        """Create a spec from resolver arguments; `key` is the default name."""
+        if len(args) == 2:
+            name, kwargs = args
+        elif len(args) == 1:
+            name = key
+            kwargs = args[0]
         else:
+            raise ValueError(f"Invalid number of arguments for {resolver}: {len(args)}")
+
+        kwargs = dict(**kwargs)
+        default = kwargs.pop("default", _NO_DEFAULT)
+        return SuggestSpec(resolver, name, MappingProxyType(kwargs), default)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # `MappingProxyType` and the `_NO_DEFAULT` sentinel cannot be pickled as is.
+        default = (self.default,) if self.has_default else ()
+        return _unpickle_spec, (
+            self.resolver,
+            self.name,
+            dict(self.kwargs),
+            self.dependent,
+            *default,
+        )
+
+    @property
+    def has_default(self) -> bool:
+        return self.default is not _NO_DEFAULT
+
+    def get_default(self) -> Any:
+        if not self.has_default:
             raise RuntimeError(
-                f"No default value is set to the parameter '{name}' "
+                f"No default value is set to the parameter '{self.name}' "
                 "although a trial object is not specified."
             )
+        return self.default
+
+    def suggest(self, trial: Any) -> Any:
+        method = getattr(trial, SUGGEST_METHODS[self.resolver])
+        recorder = stats._stats
+        if recorder is None:
+            return method(self.name, **self.kwargs)
+
+        start = time.perf_counter()
+        value = method(self.name, **self.kwargs)
+        recorder.record_suggest(self.name, trial, time.perf_counter() - start)
+        return value
+
+    def distribution(self) -> "BaseDistribution":
+        return DISTRIBUTIONS[self.resolver](**self.kwargs)
+
+    def representative(self) -> Any:
+        """Return a value valid for this parameter, preferring the default."""
+        if self.has_default:
+            return self.default
+        if "choices" in self.kwargs:
+            return self.kwargs["choices"][0]
+        return self.kwargs["low"]
+
+
+def _unpickle_spec(
+    resolver: str, name: str, kwargs: Dict[str, Any], dependent: bool, *default: Any
+) -> SuggestSpec:
+    spec = SuggestSpec(resolver, name, MappingProxyType(kwargs), *default)
+    return replace(spec, dependent=dependent) if dependent else spec
+
+
+def _is_ot_interpolation(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("${ot.") and value.endswith("}")
+
+
+class _NotASpec(Exception):
+    pass
+
+
+@lru_cache(maxsize=4096)
+def parse_spec(value: str, key: str) -> Optional[SuggestSpec]:
+    """Parse an interpolation string consisting of a single `ot.*` resolver.
+
+    `key` is used as the parameter name if the interpolation does not give one.
+    Returns `None` if `value` is not such a string, or if its arguments contain
+    other interpolations, whose values depend on the config. Results are cached
+    in a process-wide LRU cache.
+    """
+    if not _is_ot_interpolation(value):
+        return None
+
+    specs = []
+
+    def node_interpolation_callback(inter_key: str, memo: Any) -> Any:
+        raise _NotASpec
+
+    def resolver_interpolation_callback(
+        name: str, args: Tuple[Any, ...], args_str: Tuple[str, ...]
+    ) -> Any:
+        if name not in SUGGEST_METHODS:
+            raise _NotASpec
+        specs.append(SuggestSpec.from_args(name, args, key))
+        return specs[-1]
+
+    visitor = GrammarVisitor(
+        node_interpolation_callback, resolver_interpolation_callback, memo=None
+    )
+    try:
+        result = visitor.visit(parse(value))
+    except Exception:
+        return None
+
+    if len(specs) != 1 or result is not specs[0]:
+        return None
+    return specs[0]
+
+
+def _iter_ot_nodes(
+    conf: Union[DictConfig, ListConfig], path: NodePath = ()
+) -> Iterator[Tuple[Union[DictConfig, ListConfig], Any, NodePath]]:
+    keys: Iterable[Any] = (
+        conf.keys() if isinstance(conf, DictConfig) else range(len(conf))
+    )
+    for key in keys:
+        node = _child(conf, key)
+        if isinstance(node, (DictConfig, ListConfig)):
+            if not node._is_none() and not node._is_missing():
+                yield from _iter_ot_nodes(node, path + (key,))
+        elif _is_ot_interpolation(node._value()):
+            yield conf, key, path + (key,)
+
+
+def collect_specs(conf: Union[DictConfig, ListConfig]) -> Dict[NodePath, SuggestSpec]:
+    """Return the `ot.*` nodes of a config with their parsed arguments.
+
+    Only nodes whose whole value is a single `ot.*` interpolation are collected.
+    No trial is used and no parameter is suggested. The specs of nodes whose
+    arguments refer to other nodes are marked as `dependent`.
+    """
+    specs: Dict[NodePath, SuggestSpec] = {}
+    for parent, key, path in _iter_ot_nodes(conf):
+        node = _child(parent, key)
+        if _is_budget_interpolation(node._value()):
+            continue
+        if parse_switch(node._value()) is not None:
+            continue
+        spec = parse_spec(node._value(), str(key))
+        if spec is None:
+            # Arguments depending on other nodes need to be resolved.
+            recorded: List[Tuple[Node, SuggestSpec]] = []
+            token = _spec_recorder.set(recorded)
+            try:
+                parent[key]
+            finally:
+                _spec_recorder.reset(token)
+            node_specs = [s for n, s in recorded if n is node]
+            if len(node_specs) != 1:
+                continue
+            spec = replace(node_specs[0], dependent=True)
+        specs[path] = spec
+
+    return specs
+
+
+def search_space(
+    conf: Union[DictConfig, ListConfig]
+) -> Tuple[Dict[str, "BaseDistribution"], Dict[str, Any]]:
+    """Return the distributions and the default values of the parameters of a config.
+
+    Parameters of dependent specs have no distribution, as their arguments are only
+    known once the nodes they refer to are resolved against a trial. Raises
+    `ValueError` if a parameter name is used with different distributions.
+    """
+    return _search_space(collect_specs(conf).values())
+
+
+def _search_space(
+    specs: Iterable[SuggestSpec],
+) -> Tuple[Dict[str, "BaseDistribution"], Dict[str, Any]]:
+    distributions: Dict[str, "BaseDistribution"] = {}
+    defaults: Dict[str, Any] = {}
+    for spec in specs:
+        if spec.has_default:
+            defaults[spec.name] = spec.default
+        if spec.dependent:
+            continue
+        distribution = spec.distribution()
+        if distributions.setdefault(spec.name, distribution) != distribution:
+            raise ValueError(
+                f"The parameter '{spec.name}' is defined with different distributions: "
+                f"{distributions[spec.name]} and {distribution}"
+            )
+
+    return distributions, defaults
+
+
+@lru_cache(maxsize=4096)
+def parse_switch(value: str) -> Optional[str]:
+    """Return the path of the branches of an `ot.switch` interpolation string.
+
+    Returns `None` if `value` is not a single `ot.switch` interpolation.
+    """
+    if not (isinstance(value, str) and value.startswith("${ot.switch:")):
+        return None
+
+    found = []
+
+    def resolver_interpolation_callback(
+        name: str, args: Tuple[Any, ...], args_str: Tuple[str, ...]
+    ) -> Any:
+        if name != "ot.switch":
+            return None
+        found.append(args[1] if len(args) == 2 and isinstance(args[1], str) else None)
+        return found
+
+    visitor = GrammarVisitor(
+        lambda inter_key, memo: None, resolver_interpolation_callback, memo=None
+    )
+    try:
+        result = visitor.visit(parse(value))
+    except Exception:
+        return None
+
+    if result is not found or len(found) != 1:
+        return None
+    return found[0]
+
+
+def _node_path(node: Node, top: Node) -> Optional[NodePath]:
+    path: List[Any] = []
+    while node is not top:
+        parent = node._get_parent()
+        if parent is None:
+            return None
+        path.append(node._key())
+        node = parent
+    return tuple(reversed(path))
+
+
+def _child(conf: Union[DictConfig, ListConfig], key: Any) -> Node:
+    node = conf._get_node(key)
+    assert isinstance(node, Node)
+    return node
+
 
+def _get_node(conf: Union[DictConfig, ListConfig], path: NodePath) -> Node:
+    node: Any = conf
+    for key in path:
+        node = node._get_node(key)
+    return node
+
+
+def _get_container(
+    conf: Union[DictConfig, ListConfig], path: NodePath
+) -> Union[DictConfig, ListConfig]:
+    return cast(Union[DictConfig, ListConfig], _get_node(conf, path))
+
+
+def collect_switches(conf: Union[DictConfig, ListConfig]) -> Dict[NodePath, NodePath]:
+    """Map the `ot.switch` nodes of a config to the containers of their branches."""
+    switches: Dict[NodePath, NodePath] = {}
+    root = conf._get_root()
+    for parent, key, path in _iter_ot_nodes(conf):
+        branches = parse_switch(_child(parent, key)._value())
+        if branches is None:
+            continue
+        container = OmegaConf.select(root, branches)
+        if not isinstance(container, DictConfig):
+            raise ValueError(f"The branches of '{path}', '{branches}', are not a dict")
+        branches_path = _node_path(container, conf)
+        if branches_path is not None:
+            switches[path] = branches_path
+
+    return switches
+
+
+def _is_active(path: NodePath, roots: Set[NodePath], selected: Set[NodePath]) -> bool:
+    return all(
+        path[:i] not in roots or path[: i + 1] in selected for i in range(len(path))
+    )
+
+
+def _select_branches(
+    conf: Union[DictConfig, ListConfig],
+    switches: Dict[NodePath, NodePath],
+    specs: Optional[Dict[NodePath, SuggestSpec]] = None,
+    suggest: Optional[Callable[[Dict[NodePath, SuggestSpec]], Any]] = None,
+) -> List[Node]:
+    """Resolve the `ot.switch` nodes of a config and return the unselected branches.
+
+    Before each round of switches is resolved, `suggest` is called with the specs
+    of `specs` that have become active, so that the parameters of a branch are
+    suggested only once the branch is selected.
+    """
+    roots = set(switches.values())
+    selected: Set[NodePath] = set()
+    done: Set[NodePath] = set()
+    pending = dict(specs or {})
+    while True:
+        active = {p: s for p, s in pending.items() if _is_active(p, roots, selected)}
+        if active and suggest is not None:
+            suggest(active)
+        for path in active:
+            del pending[path]
+
+        todo = [p for p in switches if p not in done and _is_active(p, roots, selected)]
+        if not todo:
+            break
+        for path in todo:
+            done.add(path)
+            recorded: List[Tuple[Node, Any]] = []
+            parent: Any = _get_node(conf, path[:-1])
+            token = _switch_recorder.set(recorded)
+            try:
+                parent[path[-1]]
+            finally:
+                _switch_recorder.reset(token)
+            node = _get_node(conf, path)
+            selected.update(switches[path] + (k,) for n, k in recorded if n is node)
+
+    inactive = []
+    for root in roots:
+        container = _get_container(conf, root)
+        for key in container.keys():
+            if root + (key,) not in selected:
+                inactive.append(_child(container, key))
+    return inactive
+
+
+def resolve_active(conf: Union[DictConfig, ListConfig]) -> None:
+    """Resolve a config in place, except for the branches not selected by `ot.switch`.
+
+    The nodes of the branches that are not selected are left as they are, so their
+    parameters are not suggested.
+    """
+    switches = collect_switches(conf)
+    if not switches:
+        OmegaConf.resolve(conf)
+        return
+
+    inactive = _select_branches(conf, switches)
+    _resolve_active(conf, frozenset(id(node) for node in inactive))
+
+
+def _resolve_active(
+    conf: Union[DictConfig, ListConfig], inactive: FrozenSet[int]
+) -> None:
+    # `omegaconf._impl._resolve`, skipping the nodes in `inactive`.
+    keys: Iterable[Any] = (
+        conf.keys() if isinstance(conf, DictConfig) else range(len(conf))
+    )
+    for key in keys:
+        node = _child(conf, key)
+        if id(node) in inactive:
+            continue
+        if not node._is_interpolation():
+            if isinstance(node, (DictConfig, ListConfig)):
+                _resolve_active(node, inactive)
+            continue
+        try:
+            resolved = node._dereference_node()
+        except InterpolationToMissingValueError:
+            node._set_value(MISSING)
+            continue
+        if isinstance(resolved, (DictConfig, ListConfig)):
+            _resolve_active(resolved, inactive)
+            if isinstance(node, ValueNode):
+                conf[key] = resolved
+                continue
+        node._set_value(resolved._value())
+
+
+def resolved_copy(conf: Union[DictConfig, ListConfig]) -> Union[DictConfig, ListConfig]:
+    """Return a copy of a config resolved with `resolve_active`.
+
+    The copy is resolved with the trial bound to `conf`, whose parameter cache is
+    shared.
+    """
+    trial, cache = _get_binding(cast(Union[DictConfig, ListConfig], conf._get_root()))
+    binding = None if trial is None else (trial, cache or ParamCache())
+    copied = copy.deepcopy(conf)
+    token = _context_binding.set(binding)
+    try:
+        resolve_active(copied)
+    finally:
+        _context_binding.reset(token)
+    return copied
+
+
+def _is_budget_interpolation(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("${ot.budget:")
+
+
+def collect_budgets(conf: Union[DictConfig, ListConfig]) -> Dict[NodePath, str]:
+    """Return the `ot.budget` nodes of a config with their interpolation strings."""
+    return {
+        path: _child(parent, key)._value()
+        for parent, key, path in _iter_ot_nodes(conf)
+        if _is_budget_interpolation(_child(parent, key)._value())
+    }
+
+
+@contextmanager
+def keep_budgets(conf: Union[DictConfig, ListConfig]) -> Iterator[None]:
+    """Restore the `ot.budget` nodes of a config after it is resolved in place.
+
+    The budget of a trial changes as it completes rungs, so the nodes must keep
+    resolving it on each access.
+    """
+    budgets = collect_budgets(conf)
+    try:
+        yield
+    finally:
+        if budgets:
+            with read_write(conf):
+                for path, value in budgets.items():
+                    parent: Any = _get_node(conf, path[:-1])
+                    parent[path[-1]] = value
+
+
+_SCHEDULE_ATTR = "omegatuna.budget_schedule"
+
+
+def completed_rungs(trial: Any) -> int:
+    """Return the number of rungs of successive halving a trial has completed."""
+    return _count_rungs(getattr(trial, "system_attrs", None) or {})
+
+
+def _count_rungs(system_attrs: Dict[str, Any]) -> int:
+    rung = 0
+    while f"completed_rung_{rung}" in system_attrs:
+        rung += 1
+    return rung
+
+
+def _pruner_schedule(trial: Any) -> Optional[Tuple[int, int]]:
+    """Return the reduction factor and the early-stopping rate of a trial's pruner.
+
+    Returns `None` unless the study of the trial is pruned in rungs by
+    `SuccessiveHalvingPruner` or `HyperbandPruner`.
+    """
+    study = getattr(trial, "study", None)
+    pruner = getattr(study, "pruner", None)
+    if pruner is None:
+        return None
+
+    from optuna.pruners import HyperbandPruner, SuccessiveHalvingPruner
+
+    if isinstance(pruner, SuccessiveHalvingPruner):
+        return pruner._reduction_factor, pruner._min_early_stopping_rate
+    if isinstance(pruner, HyperbandPruner):
+        # Until the number of brackets is known, trials are not pruned.
+        if not pruner._pruners:
+            return None
+        return pruner._reduction_factor, pruner._get_bracket_id(
+            cast("Study", study), trial
+        )
+    return None
+
+
+def rung_budget(
+    low: Union[int, float],
+    high: Union[int, float],
+    rung: int,
+    reduction_factor: int = 4,
+    min_early_stopping_rate: int = 0,
+) -> Union[int, float]:
+    """Return the budget of a rung: `low * reduction_factor ** (rate + rung)`.
+
+    The budget is capped by `high`, and is an integer if `low` and `high` are.
+    """
+    budget = min(high, low * reduction_factor ** (min_early_stopping_rate + rung))
+    if isinstance(low, int) and isinstance(high, int):
+        return int(budget)
+    return float(budget)
+
+
+_install_lock = threading.Lock()
+_DEFERRED_KEY = "_omegatuna_deferred_trial_ids"
+
+
+def _defer_flushes(storage: Any, trial_id: int) -> bool:
+    # `_CachedStorage`, which wraps `RDBStorage`, writes the updates of a trial in
+    # a single transaction when the trial is flushed, and it flushes the trial on
+    # every `set_trial_param` call. While a trial is deferred, `_flush_trial` is
+    # replaced on the storage instance and skips it. The replacement is removed
+    # with the last deferred trial, so that the storage can still be pickled.
+    # Returns False if flushes cannot be or are already deferred.
+    flush = getattr(type(storage), "_flush_trial", None)
+    if flush is None:
+        return False
+
+    with _install_lock:
+        deferred: Optional[Set[int]] = storage.__dict__.get(_DEFERRED_KEY)
+        if deferred is None:
+            deferred = set()
+            skipped = deferred
+
+            def _flush_trial(trial_id: int) -> bool:
+                if trial_id in skipped:
+                    return True
+                return flush(storage, trial_id)
+
+            storage.__dict__[_DEFERRED_KEY] = deferred
+            storage.__dict__["_flush_trial"] = _flush_trial
+        elif trial_id in deferred:
+            return False
+        deferred.add(trial_id)
+    return True
+
+
+def _resume_flushes(storage: Any, trial_id: int) -> None:
+    with _install_lock:
+        deferred = storage.__dict__[_DEFERRED_KEY]
+        deferred.discard(trial_id)
+        if not deferred:
+            del storage.__dict__[_DEFERRED_KEY]
+            del storage.__dict__["_flush_trial"]
+    # Optuna flushes a trial only with the lock of the storage held.
+    with storage._lock:
+        type(storage)._flush_trial(storage, trial_id)
+
+
+@contextmanager
+def batched_writes(trial: Any) -> Iterator[None]:
+    """Write the parameters suggested by `trial` within the block at once.
+
+    With RDB storage, the parameters are committed in one transaction at the end
+    of the block instead of one transaction per parameter. A parameter whose name
+    is new to the process is still inserted immediately so that its distribution is
+    checked against other processes. For the other storages this is a no-op.
+    """
+    storage = getattr(trial, "storage", None)
+    trial_id = getattr(trial, "_trial_id", None)
+    if storage is None or trial_id is None or not _defer_flushes(storage, trial_id):
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        _resume_flushes(storage, trial_id)
+
+
+def suggest_all(conf: Union[DictConfig, ListConfig]) -> Dict[str, Any]:
+    """Suggest all the parameters of a trial-bound config in one batch.
+
+    Parameters in branches not selected by `ot.switch` nodes are not suggested.
+
+    The suggested values are stored in the parameter cache of `conf`, so that the
+    resolvers do not call `trial.suggest_*` again. Returns all the values in the
+    cache, including those of nodes already replaced by concrete values.
+    """
+    trial, cache = _get_binding(conf)
+    if trial is None or cache is None:
+        raise RuntimeError("no trial is bound to the config")
+
+    specs = collect_specs(conf)
+    switches = collect_switches(conf)
+    if not switches:
+        _suggest_specs(conf, trial, cache, specs)
+        return dict(cache.values)
+
+    # Only the parameters of the branches selected by `ot.switch` are suggested.
+    with batched_writes(trial):
+        _select_branches(
+            conf,
+            switches,
+            specs,
+            lambda active: _suggest_specs(conf, trial, cache, active),
+        )
+    return dict(cache.values)
+
+
+def _suggest_specs(
+    conf: Union[DictConfig, ListConfig],
+    trial: Any,
+    cache: ParamCache,
+    specs: Dict[NodePath, SuggestSpec],
+) -> Dict[NodePath, Any]:
+    """Suggest the parameters of `specs` and return their values by node path.
+
+    Dependent nodes are resolved against the binding of `conf` once the others
+    are suggested, so that their arguments, and any node they refer to, take the
+    values of the trial.
+    """
+    values: Dict[NodePath, Any] = {}
+    with batched_writes(trial):
+        for path, spec in specs.items():
+            if spec.dependent:
+                continue
+            try:
+                value = cache.values[spec.name]
+            except KeyError:
+                value = spec.suggest(trial)
+                cache.values[spec.name] = value
+                cache.misses += 1
+            values[path] = value
+        for path, spec in specs.items():
+            if spec.dependent:
+                parent: Any = _get_node(conf, path[:-1])
+                values[path] = parent[path[-1]]
+
+    return values
+
+
+def _suggest(
+    resolver_name: str,
+    *args,
+    _root_: Union[DictConfig, ListConfig],
+    _node_: Node,
+) -> Any:
+    key = str(_node_._key())
+    spec = parse_spec(_node_._value(), key)
+    if spec is None:
+        spec = SuggestSpec.from_args(resolver_name, args, key)
+    if stats._stats is not None:
+        stats._stats.record_resolver_call(spec.name, _get_binding(_root_)[0])
+
+    recorder = _spec_recorder.get()
+    if recorder is not None:
+        recorder.append((_node_, spec))
+        return spec.representative()
+
+    trial, cache = _get_binding(_root_)
+    if trial is None:
+        return spec.get_default()
+
+    if cache is not None:
+        try:
+            value = cache.values[spec.name]
+        except KeyError:
+            cache.misses += 1
+        else:
+            cache.hits += 1
+            return value
+
+    value = spec.suggest(trial)
+    if cache is not None:
+        cache.values[spec.name] = value
+    return value
+
+
+def _switch(
+    key: Any, branches: str, *, _root_: Union[DictConfig, ListConfig], _node_: Node
+) -> Any:
+    if _spec_recorder.get() is not None:
+        return None
+    container = OmegaConf.select(_root_, branches)
+    if not isinstance(container, DictConfig):
+        raise ValueError(f"The branches '{branches}' are not a dict")
+    if key not in container:
+        raise KeyError(f"'{key}' is not a branch of '{branches}'")
+
+    recorder = _switch_recorder.get()
+    if recorder is not None:
+        recorder.append((_node_, key))
+    return container[key]
+
+
+def _budget(kwargs: Any, *, _root_: Union[DictConfig, ListConfig], _node_: Node) -> Any:
+    if _spec_recorder.get() is not None:
+        return None
     kwargs = dict(**kwargs)
-    if "default" in kwargs:
-        del kwargs["default"]
+    try:
+        low = kwargs.pop("low")
+        high = kwargs.pop("high")
+    except KeyError as e:
+        raise ValueError(f"ot.budget requires {e}") from None
+    unknown = set(kwargs) - {"reduction_factor", "min_early_stopping_rate"}
+    if unknown:
+        raise ValueError(f"Unknown arguments for ot.budget: {sorted(unknown)}")
+    if not 0 < low <= high:
+        raise ValueError(f"Invalid budget range for ot.budget: [{low}, {high}]")
+
+    trial, _ = _get_binding(_root_)
+    if trial is None:
+        return high
 
-    return getattr(trial, SUGGEST_METHODS[resolver_name])(name, **kwargs)
+    system_attrs = getattr(trial, "system_attrs", None) or {}
+    rung = _count_rungs(system_attrs)
+    schedule = _pruner_schedule(trial)
+    if schedule is not None:
+        # Record the schedule so that the budget of the trial can be resolved
+        # once it is finished, e.g. from a `FrozenTrial`.
+        if system_attrs.get(_SCHEDULE_ATTR) != list(schedule):
+            trial.set_system_attr(_SCHEDULE_ATTR, list(schedule))
+    elif _SCHEDULE_ATTR in system_attrs:
+        reduction_factor, rate = system_attrs[_SCHEDULE_ATTR]
+        schedule = (reduction_factor, rate)
+    elif rung == 0:
+        # Trials that are not pruned in rungs run with the full budget.
+        return high
+    else:
+        # Those recorded without a schedule follow the defaults of
+        # `SuccessiveHalvingPruner`.
+        schedule = (4, 0)
+    reduction_factor = kwargs.get("reduction_factor", schedule[0])
+    min_early_stopping_rate = kwargs.get("min_early_stopping_rate", schedule[1])
+    return rung_budget(low, high, rung, reduction_factor, min_early_stopping_rate)
 
 
 def register_ot_resolvers() -> None:
@@ -58,6 +870,8 @@ def register_ot_resolvers() -> None:
         OmegaTuna.register_new_resolver(
             key, partial(_suggest, key), replace=True, use_cache=False
         )
+    OmegaTuna.register_new_resolver("ot.switch", _switch, replace=True, use_cache=False)
+    OmegaTuna.register_new_resolver("ot.budget", _budget, replace=True, use_cache=False)
 
 
 register_ot_resolvers()
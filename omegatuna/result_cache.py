@@ -0,0 +1,142 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar, Union
+
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from .omegatuna import CacheInfo
+from .resolvers import suggest_all
+
+Config = Union[DictConfig, ListConfig]
+T = TypeVar("T")
+
+_USER_ATTR = "omegatuna.result_cache_hit"
+
+
+class ResultCache:
+    """On-disk cache of objective values keyed by the values of `ot.*` parameters.
+
+    Values are stored in a SQLite file at `path`. Use `wrap` to make an objective
+    return the stored value when a trial proposes parameters evaluated before.
+    Keys also depend on `namespace` and on the rest of the config, so that
+    objectives or configs sharing a file do not return each other's values.
+    """
+
+    def __init__(self, path: str, namespace: str = "") -> None:
+        self.path = path
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The connection and the lock are re-created in each process.
+        return {
+            "path": self.path,
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def key(params: Mapping[str, Any], namespace: str = "") -> str:
+        """Return a canonical hash of parameter values within a namespace."""
+        data = json.dumps([namespace, sorted(params.items())], default=repr)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def config_key(self, conf: Config) -> str:
+        """Return the key of a trial-bound config.
+
+        It hashes the parameters of `conf`, suggesting them if they have not been
+        yet, together with `namespace` and the unresolved config.
+        """
+        unresolved = OmegaConf.to_container(conf, resolve=False)
+        data = json.dumps([self.namespace, unresolved], default=repr, sort_keys=True)
+        return self.key(suggest_all(conf), hashlib.sha256(data.encode()).hexdigest())
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            (size,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            return CacheInfo(self.hits, self.misses, size)
+
+    def wrap(self, objective: Callable[[Any, Config], T]) -> Callable[[Any, Config], T]:
+        """Wrap an objective called as `objective(trial, conf)`.
+
+        The key is `config_key(conf)`. On a hit, the stored value is returned
+        without calling `objective`, and the trial gets the user attribute
+        `omegatuna.result_cache_hit`.
+        """
+
+        @functools.wraps(objective)
+        def wrapper(trial: Any, conf: Config) -> T:
+            key = self.config_key(conf)
+            value = self.get(key)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                trial.set_user_attr(_USER_ATTR, True)
+                return value
+
+            with self._lock:
+                self.misses += 1
+            trial.set_user_attr(_USER_ATTR, False)
+            value = objective(trial, conf)
+            self.set(key, value)
+            return value
+
+        return wrapper
@@ -0,0 +1,151 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+import pathlib
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from omegaconf import DictConfig, ListConfig
+
+from .omegatuna import OmegaTuna
+from .template import ConfigTemplate
+
+if TYPE_CHECKING:
+    import optuna
+    from optuna.samplers import BaseSampler
+
+Objective = Callable[["optuna.Trial", Union[DictConfig, ListConfig]], float]
+
+
+def run(
+    objective: Objective,
+    config: Any,
+    n_trials: int,
+    n_workers: int = 1,
+    storage: Optional[str] = None,
+    study_name: Optional[str] = None,
+    direction: str = "minimize",
+    sampler: Optional["BaseSampler"] = None,
+) -> "optuna.Study":
+    """Optimize `objective` with trials distributed over worker processes.
+
+    `config` is a path to a YAML file, a `ConfigTemplate` or anything
+    `OmegaTuna.create` accepts. It is compiled once in the calling process and the
+    template is sent to the workers, each of which calls
+    `objective(trial, template.instantiate(trial))`.
+
+    The workers share the study through `storage`, an RDB URL. If it is not
+    given, a SQLite file in a new temporary directory is used, and the study is
+    copied to memory before the directory is removed. `objective` and `sampler`
+    must be picklable when `n_workers > 1`. Every worker gets a copy of `sampler`,
+    reseeded so that the workers do not propose the same parameters.
+    """
+    import optuna
+
+    template = _compile(config)
+    tmpdir = None
+    if storage is None:
+        tmpdir = tempfile.mkdtemp()
+        storage = "sqlite:///" + os.path.join(tmpdir, "omegatuna.db")
+
+    try:
+        study = optuna.create_study(
+            storage=storage,
+            study_name=study_name,
+            direction=direction,
+            sampler=sampler,
+            load_if_exists=study_name is not None,
+        )
+        _run_workers(
+            template, objective, storage, study.study_name, sampler, n_trials, n_workers
+        )
+        if tmpdir is not None:
+            in_memory = optuna.storages.InMemoryStorage()
+            optuna.copy_study(study.study_name, storage, in_memory)
+            study = optuna.load_study(
+                study_name=study.study_name, storage=in_memory, sampler=study.sampler
+            )
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return study
+
+
+def _run_workers(
+    template: ConfigTemplate,
+    objective: Objective,
+    storage: str,
+    study_name: str,
+    sampler: Optional["BaseSampler"],
+    n_trials: int,
+    n_workers: int,
+) -> None:
+    n_workers = max(1, min(n_workers, n_trials))
+    if n_workers == 1:
+        _optimize(template, objective, storage, study_name, sampler, n_trials, False)
+        return
+
+    chunks = [n_trials // n_workers] * n_workers
+    for i in range(n_trials % n_workers):
+        chunks[i] += 1
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(
+                _optimize,
+                template,
+                objective,
+                storage,
+                study_name,
+                sampler,
+                chunk,
+                True,
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            future.result()
+
+
+def _compile(config: Any) -> ConfigTemplate:
+    if isinstance(config, ConfigTemplate):
+        return config
+    if isinstance(config, pathlib.Path) or (
+        isinstance(config, str) and os.path.isfile(config)
+    ):
+        return OmegaTuna.compile(OmegaTuna.load(config))
+    return OmegaTuna.compile(config)
+
+
+def _optimize(
+    template: ConfigTemplate,
+    objective: Objective,
+    storage: str,
+    study_name: str,
+    sampler: Optional["BaseSampler"],
+    n_trials: int,
+    reseed: bool,
+) -> None:
+    import optuna
+
+    study = optuna.load_study(study_name=study_name, storage=storage, sampler=sampler)
+    if reseed:
+        # Each worker unpickles the same state of the sampler.
+        study.sampler.reseed_rng()
+    study.optimize(
+        lambda trial: objective(trial, template.instantiate(trial)), n_trials=n_trials
+    )
@@ -0,0 +1,172 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import math
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+from omegaconf import DictConfig, ListConfig
+
+from .resolvers import SuggestSpec, collect_specs
+
+METHODS = ("random", "sobol", "grid")
+
+
+def sample(
+    conf: Union[DictConfig, ListConfig],
+    n: int,
+    method: str = "random",
+    seed: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Draw `n` values of every parameter of a config without Optuna trials.
+
+    Returns a dict mapping each parameter name to an array of its values; the
+    `i`-th configuration consists of the `i`-th element of every array.
+
+    - `"random"`: independent uniform samples, in the log domain for log scales
+    - `"sobol"`: a scrambled Sobol sequence (requires SciPy 1.7 or later)
+    - `"grid"`: the Cartesian product of evenly spaced levels of each parameter,
+      all the choices of categorical parameters included, with as many levels as
+      fit in `n` rows. If even two levels per parameter do not fit, `n` rows are
+      returned in which the levels of each parameter appear equally often, in an
+      order shuffled with `seed`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, not {method!r}")
+
+    specs: Dict[str, SuggestSpec] = {}
+    for spec in collect_specs(conf).values():
+        specs.setdefault(spec.name, spec)
+    d = len(specs)
+
+    if method == "random":
+        u = np.random.default_rng(seed).random((n, d))
+    elif method == "sobol":
+        try:
+            from scipy.stats import qmc  # type: ignore
+        except ImportError:
+            raise ImportError("method='sobol' requires SciPy 1.7 or later")
+        u = qmc.Sobol(d, scramble=True, seed=seed).random(n) if d else np.empty((n, 0))
+    else:
+        u = _grid(list(specs.values()), n, seed)
+
+    return {
+        name: _from_unit(spec, u[:, i]) for i, (name, spec) in enumerate(specs.items())
+    }
+
+
+def rows(samples: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    """Iterate over the configurations of `sample` as dicts of Python scalars.
+
+    Each dict can be passed to `optuna.trial.FixedTrial` to build a config.
+    """
+    columns = {name: values.tolist() for name, values in samples.items()}
+    for i in range(len(next(iter(columns.values()), []))):
+        yield {name: values[i] for name, values in columns.items()}
+
+
+def _n_levels(spec: SuggestSpec) -> Optional[int]:
+    """Return the number of values a parameter can take, or None if continuous."""
+    kwargs = spec.kwargs
+    if spec.resolver == "ot.categorical":
+        return len(kwargs["choices"])
+    if spec.resolver == "ot.int" and not kwargs.get("log", False):
+        return (kwargs["high"] - kwargs["low"]) // kwargs.get("step", 1) + 1
+    q = _step(spec)
+    if q is not None:
+        return int(math.floor((kwargs["high"] - kwargs["low"]) / q + 1e-8)) + 1
+    return None
+
+
+def _levels(spec: SuggestSpec, k: int) -> np.ndarray:
+    """Return up to `k` evenly spaced levels of a parameter in [0, 1].
+
+    All the choices of a categorical parameter are returned whatever `k` is.
+    """
+    m = _n_levels(spec)
+    if m is not None and (m <= k or spec.resolver == "ot.categorical"):
+        return (np.arange(m) + 0.5) / m
+    if m is not None:
+        return (np.arange(k) + 0.5) / k
+    return np.linspace(0.0, 1.0, k)
+
+
+def _grid(specs: List[SuggestSpec], n: int, seed: Optional[int] = None) -> np.ndarray:
+    if not specs:
+        return np.empty((min(n, 1), 0))
+
+    # The largest number of levels per parameter whose grid has at most `n` rows.
+    k = max(2, math.ceil(n ** (1 / len(specs))))
+    while True:
+        levels = [_levels(spec, k) for spec in specs]
+        shape = tuple(len(level) for level in levels)
+        if int(np.prod(shape)) <= n:
+            indices = np.unravel_index(np.arange(int(np.prod(shape))), shape)
+            return np.stack([level[i] for level, i in zip(levels, indices)], axis=1)
+        if k == 2:
+            break
+        k -= 1
+
+    # Even two levels per parameter give more than `n` rows: each column is then
+    # a shuffled repetition of the levels, so that every level appears if there
+    # are at least as many rows as levels.
+    rng = np.random.default_rng(seed)
+    columns = []
+    for spec in specs:
+        level = _levels(spec, n)
+        columns.append(level[rng.permutation(np.resize(np.arange(len(level)), n))])
+    return np.stack(columns, axis=1)
+
+
+def _step(spec: SuggestSpec) -> Optional[float]:
+    if spec.resolver == "ot.discrete_uniform":
+        return spec.kwargs["q"]
+    if spec.resolver == "ot.float":
+        return spec.kwargs.get("step")
+    return None
+
+
+def _is_log(spec: SuggestSpec) -> bool:
+    return spec.resolver == "ot.loguniform" or bool(spec.kwargs.get("log", False))
+
+
+def _from_unit(spec: SuggestSpec, u: np.ndarray) -> np.ndarray:
+    """Map values in [0, 1] to values of a parameter, as `trial.suggest_*` would."""
+    kwargs = spec.kwargs
+    if spec.resolver == "ot.categorical":
+        choices = np.empty(len(kwargs["choices"]), dtype=object)
+        choices[:] = list(kwargs["choices"])
+        return choices[np.minimum((u * len(choices)).astype(int), len(choices) - 1)]
+
+    low, high = kwargs["low"], kwargs["high"]
+    if spec.resolver == "ot.int":
+        if _is_log(spec):
+            log_low, log_high = math.log(low - 0.5), math.log(high + 0.5)
+            values = np.round(np.exp(log_low + u * (log_high - log_low)))
+            return np.clip(values, low, high).astype(int)
+        step = kwargs.get("step", 1)
+        m = _n_levels(spec)
+        assert m is not None
+        return low + np.minimum((u * m).astype(int), m - 1) * step
+
+    q = _step(spec)
+    if q is not None:
+        m = _n_levels(spec)
+        assert m is not None
+        return low + np.minimum((u * m).astype(int), m - 1) * q
+    if _is_log(spec):
+        values = np.exp(math.log(low) + u * (math.log(high) - math.log(low)))
+    else:
+        values = low + u * (high - low)
+    return np.clip(values, low, high)
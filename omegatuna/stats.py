@@ -0,0 +1,172 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import functools
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, Optional, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class ResolverStats:
+    """Counters and timings of config materialization.
+
+    - `resolver_calls`: number of `ot.*` resolver invocations per parameter
+    - `suggest_calls`, `suggest_time`: number of `trial.suggest_*` calls and the
+      seconds spent in them, per parameter
+    - `op_calls`, `op_time`: number of calls and seconds spent in
+      `OmegaTuna.create`, `load` and `merge`
+    - `constraint_checks`, `constraint_rejections`: number of evaluations and
+      violations of each constraint
+    - `trial_totals`: the resolver calls, suggest calls and seconds, and the
+      seconds spent in each operation, per trial number, as stored by
+      `set_user_attrs`
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.resolver_calls: DefaultDict[str, int] = defaultdict(int)
+        self.suggest_calls: DefaultDict[str, int] = defaultdict(int)
+        self.suggest_time: DefaultDict[str, float] = defaultdict(float)
+        self.op_calls: DefaultDict[str, int] = defaultdict(int)
+        self.op_time: DefaultDict[str, float] = defaultdict(float)
+        self.constraint_checks: DefaultDict[str, int] = defaultdict(int)
+        self.constraint_rejections: DefaultDict[str, int] = defaultdict(int)
+        self.trial_totals: DefaultDict[
+            Optional[int], DefaultDict[str, float]
+        ] = defaultdict(lambda: defaultdict(float))
+
+    def record_resolver_call(self, name: str, trial: Any = None) -> None:
+        with self._lock:
+            self.resolver_calls[name] += 1
+            self.trial_totals[getattr(trial, "number", None)]["resolver_calls"] += 1
+
+    def record_suggest(self, name: str, trial: Any, elapsed: float) -> None:
+        number = getattr(trial, "number", None)
+        with self._lock:
+            self.suggest_calls[name] += 1
+            self.suggest_time[name] += elapsed
+            totals = self.trial_totals[number]
+            totals["suggest_calls"] += 1
+            totals["suggest_time"] += elapsed
+
+    def record_op(self, op: str, elapsed: float, trial: Any = None) -> None:
+        with self._lock:
+            self.op_calls[op] += 1
+            self.op_time[op] += elapsed
+            self.trial_totals[getattr(trial, "number", None)][
+                f"op_time.{op}"
+            ] += elapsed
+
+    def record_constraint(self, name: str, violated: bool) -> None:
+        with self._lock:
+            self.constraint_checks[name] += 1
+            if violated:
+                self.constraint_rejections[name] += 1
+
+    def rejection_rates(self) -> Dict[str, float]:
+        """Return the fraction of the evaluations of each constraint that failed."""
+        with self._lock:
+            return {
+                name: self.constraint_rejections[name] / checks
+                for name, checks in self.constraint_checks.items()
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resolver_calls": dict(self.resolver_calls),
+                "suggest_calls": dict(self.suggest_calls),
+                "suggest_time": dict(self.suggest_time),
+                "op_calls": dict(self.op_calls),
+                "op_time": dict(self.op_time),
+                "constraint_checks": dict(self.constraint_checks),
+                "constraint_rejections": dict(self.constraint_rejections),
+            }
+
+    def set_user_attrs(self, trial: Any, prefix: str = "omegatuna") -> None:
+        """Store the totals of `trial` as its user attributes."""
+        with self._lock:
+            totals = dict(self.trial_totals.get(getattr(trial, "number", None), {}))
+            attrs = {
+                "resolver_calls": int(totals.get("resolver_calls", 0)),
+                "suggest_calls": int(totals.get("suggest_calls", 0)),
+                "suggest_time": totals.get("suggest_time", 0.0),
+                "op_time": {
+                    key[len("op_time.") :]: value  # noqa: E203
+                    for key, value in totals.items()
+                    if key.startswith("op_time.")
+                },
+            }
+        for key, value in attrs.items():
+            trial.set_user_attr(f"{prefix}.{key}", value)
+
+    def dump(self, path: str, **extra: Any) -> None:
+        """Append the statistics to a JSON-lines file along with `extra` items."""
+        with open(path, "a") as f:
+            f.write(json.dumps({**extra, **self.to_dict()}) + "\n")
+
+
+_stats: Optional[ResolverStats] = None
+
+
+def enable_stats() -> ResolverStats:
+    """Start recording statistics and return the object that holds them."""
+    global _stats
+    if _stats is None:
+        _stats = ResolverStats()
+    return _stats
+
+
+def disable_stats() -> None:
+    global _stats
+    _stats = None
+
+
+def get_stats() -> Optional[ResolverStats]:
+    return _stats
+
+
+def timed(op: str) -> Callable[[F], F]:
+    """Record the time spent in the decorated function while stats are enabled."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            stats = _stats
+            if stats is None:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                trial = kwargs.get("trial")
+                if trial is None:
+                    # The trial bound to the returned config, as set by
+                    # `omegatuna.omegatuna._set_trial`.
+                    trial = getattr(result, "__dict__", {}).get("_optuna_trial")
+                stats.record_op(op, time.perf_counter() - start, trial)
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -0,0 +1,211 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import copy
+import pickle
+import warnings
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+from omegaconf import DictConfig, ListConfig, read_write
+
+from .omegatuna import (
+    _bind_trial,
+    _get_param_cache,
+    _get_trial,
+    _mark_resolved,
+    _set_trial,
+)
+from .resolvers import (
+    NodePath,
+    SuggestSpec,
+    _select_branches,
+    _suggest_specs,
+    batched_writes,
+    collect_specs,
+    collect_switches,
+)
+
+if TYPE_CHECKING:
+    from optuna.distributions import BaseDistribution
+    from optuna.trial import BaseTrial, FrozenTrial
+
+
+class ConfigTemplate:
+    """A config whose `ot.*` nodes have been parsed once.
+
+    Use `OmegaTuna.compile` to create a template and `instantiate` to build a
+    config bound to a trial. Instantiation copies the template and fills the
+    `ot.*` nodes with suggested values directly, without going through the
+    interpolation grammar. Nodes in branches not selected by `ot.switch` are not
+    filled.
+    """
+
+    def __init__(self, conf: Union[DictConfig, ListConfig]) -> None:
+        if _get_trial(conf) is not None:
+            raise ValueError("cannot compile a config to which a trial is bound")
+        self._conf = conf
+        self.specs: Dict[NodePath, SuggestSpec] = collect_specs(conf)
+        self._switches = collect_switches(conf)
+        # Unpickling a snapshot is several times faster than `copy.deepcopy`.
+        # Configs that cannot be pickled, e.g. structured configs of local
+        # dataclasses, are deep-copied instead.
+        try:
+            self._snapshot: Optional[bytes] = pickle.dumps(
+                conf, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except Exception:
+            self._snapshot = None
+        self._distributions: Dict[str, "BaseDistribution"] = {}
+
+    @property
+    def config(self) -> Union[DictConfig, ListConfig]:
+        return self._conf
+
+    def instantiate(
+        self, trial: Optional["BaseTrial"] = None
+    ) -> Union[DictConfig, ListConfig]:
+        conf = self._copy()
+        if trial is None:
+            return conf
+
+        conf = _set_trial(conf, trial, complete=True)
+        cache = _get_param_cache(conf)
+        assert cache is not None
+
+        values: Dict[NodePath, Any] = {}
+
+        def suggest(specs: Dict[NodePath, SuggestSpec]) -> None:
+            values.update(_suggest_specs(conf, trial, cache, specs))
+
+        if self._switches:
+            # Nodes in branches not selected by `ot.switch` are left as they are.
+            with batched_writes(trial):
+                _select_branches(conf, self._switches, self.specs, suggest)
+        else:
+            suggest(self.specs)
+        _fill(conf, values)
+        _mark_resolved(conf)
+        return conf
+
+    def instantiate_batch(
+        self, trials: Iterable["BaseTrial"]
+    ) -> List[Optional[Union[DictConfig, ListConfig]]]:
+        """Instantiate the template for each trial, e.g. a generation of `study.ask`.
+
+        A trial rejected by the `_constraints_` of the config gets None instead of a
+        config, so that the caller can tell it as pruned; the other trials are still
+        instantiated.
+        """
+        from optuna import TrialPruned
+
+        confs: List[Optional[Union[DictConfig, ListConfig]]] = []
+        for trial in trials:
+            try:
+                confs.append(self.instantiate(trial))
+            except TrialPruned:
+                confs.append(None)
+        return confs
+
+    def instantiate_frozen(
+        self, trial: "FrozenTrial", strict: bool = False
+    ) -> Union[DictConfig, ListConfig]:
+        """Build the config of a finished trial from its stored parameters.
+
+        The `ot.*` nodes are filled with `trial.params` directly, without calling
+        `trial.suggest_*`. Parameters of the template missing from the trial,
+        parameters stored with a different distribution, and parameters of the
+        trial the template does not use are reported with a warning, or raise
+        `ValueError` if `strict` is True. Only the type of the distribution is
+        compared for nodes whose arguments refer to other nodes. Missing
+        parameters of branches of `ot.switch` are not reported. Nodes whose
+        parameters are missing are left as they are.
+        """
+        mismatches = self.mismatches(trial)
+        if mismatches:
+            message = "; ".join(mismatches)
+            message = f"Trial {trial.number} does not match the template: {message}"
+            if strict:
+                raise ValueError(message)
+            warnings.warn(message, stacklevel=2)
+
+        conf = self._copy()
+        _fill(
+            conf,
+            {
+                path: trial.params[spec.name]
+                for path, spec in self.specs.items()
+                if spec.name in trial.params
+            },
+        )
+        # Binding the trial lets the nodes left unfilled resolve from the trial. The
+        # constraints are not checked: the trial has already run.
+        cache = _bind_trial(conf, trial)
+        cache.values.update(trial.params)
+        _mark_resolved(conf)
+        return conf
+
+    def mismatches(self, trial: "FrozenTrial") -> List[str]:
+        """Describe how the parameters of a trial differ from the template."""
+        roots = set(self._switches.values())
+        conditional = {
+            spec.name
+            for path, spec in self.specs.items()
+            if any(path[:i] in roots for i in range(len(path)))
+        }
+        names = set()
+        messages = []
+        for spec in self.specs.values():
+            if spec.name in names:
+                continue
+            names.add(spec.name)
+            if spec.name not in trial.params:
+                if spec.name not in conditional:
+                    messages.append(f"'{spec.name}' is missing")
+            elif not self._matches(spec, trial.distributions[spec.name]):
+                messages.append(
+                    f"'{spec.name}' is stored with {trial.distributions[spec.name]}"
+                    f" instead of {self._distribution(spec)}"
+                )
+        messages.extend(
+            f"'{name}' is not used" for name in trial.params if name not in names
+        )
+        return messages
+
+    def _matches(self, spec: SuggestSpec, stored: "BaseDistribution") -> bool:
+        # The arguments of a dependent spec are placeholders, so only the type of
+        # its distribution is known.
+        if spec.dependent:
+            return type(stored) is type(self._distribution(spec))
+        return stored == self._distribution(spec)
+
+    def _distribution(self, spec: SuggestSpec) -> "BaseDistribution":
+        try:
+            return self._distributions[spec.name]
+        except KeyError:
+            distribution = self._distributions[spec.name] = spec.distribution()
+            return distribution
+
+    def _copy(self) -> Union[DictConfig, ListConfig]:
+        if self._snapshot is not None:
+            return pickle.loads(self._snapshot)
+        return copy.deepcopy(self._conf)
+
+
+def _fill(conf: Union[DictConfig, ListConfig], values: Dict[NodePath, Any]) -> None:
+    with read_write(conf):
+        for path, value in values.items():
+            parent: Any = conf
+            for key in path[:-1]:
+                parent = parent._get_node(key)
+            parent[path[-1]] = value
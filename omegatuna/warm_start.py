@@ -0,0 +1,131 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from omegaconf import DictConfig, ListConfig
+
+from .resolvers import _search_space, collect_specs
+
+if TYPE_CHECKING:
+    from optuna.distributions import BaseDistribution
+    from optuna.trial import FrozenTrial
+
+_USER_ATTR = "omegatuna.warm_start_from"
+
+
+class WarmStartInfo(NamedTuple):
+    added: int
+    skipped: int
+    enqueued: bool
+
+
+def map_trial(
+    trial: "FrozenTrial",
+    distributions: Dict[str, "BaseDistribution"],
+    dependent: AbstractSet[str] = frozenset(),
+) -> Optional["FrozenTrial"]:
+    """Map a finished trial onto a search space.
+
+    Parameters are matched by name. Those the search space does not define are
+    dropped, but the trial is skipped, and `None` returned, if the value of any
+    other parameter is not valid in its distribution, as the objective value would
+    not match the parameters kept. `None` is also returned if no parameter is kept.
+    Parameters named in `dependent`, whose ranges depend on other parameters, are
+    kept with their stored distributions. System attributes, such as the rungs
+    completed under a pruner, are not copied.
+    """
+    from optuna.trial import create_trial
+
+    params = {}
+    mapped_distributions = {}
+    for name, value in trial.params.items():
+        distribution = distributions.get(name)
+        if distribution is None:
+            if name in dependent:
+                params[name] = value
+                mapped_distributions[name] = trial.distributions[name]
+            continue
+        try:
+            internal = distribution.to_internal_repr(value)
+        except ValueError:
+            return None
+        if not distribution._contains(internal):
+            return None
+        params[name] = value
+        mapped_distributions[name] = distribution
+
+    if not params:
+        return None
+
+    return create_trial(
+        state=trial.state,
+        values=trial.values,
+        params=params,
+        distributions=mapped_distributions,
+        user_attrs={**trial.user_attrs, _USER_ATTR: trial.number},
+        intermediate_values=trial.intermediate_values,
+    )
+
+
+def warm_start(
+    study: Any,
+    conf: Union[DictConfig, ListConfig],
+    trials: Union[Any, Iterable["FrozenTrial"]] = (),
+    enqueue_defaults: bool = False,
+) -> WarmStartInfo:
+    """Seed a study with prior trials mapped onto the search space of a config.
+
+    `trials` is a study or an iterable of `FrozenTrial`, of which the completed
+    ones are mapped with `map_trial` and added with `study.add_trials`; those it
+    cannot map are skipped. Parameters whose arguments refer to other nodes keep
+    the distributions they were stored with. Each added trial has the number of
+    the prior trial in its user attribute `omegatuna.warm_start_from`. With
+    `enqueue_defaults`, the default values of the `ot.*` parameters are enqueued
+    as the next trial.
+    """
+    from optuna.trial import TrialState
+
+    specs = collect_specs(conf).values()
+    distributions, defaults = _search_space(specs)
+    dependent = {spec.name for spec in specs if spec.dependent}
+    if hasattr(trials, "get_trials"):
+        trials = trials.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+
+    mapped = []
+    skipped = 0
+    for trial in trials:
+        new_trial = None
+        if trial.state == TrialState.COMPLETE:
+            new_trial = map_trial(trial, distributions, dependent)
+        if new_trial is None:
+            skipped += 1
+        else:
+            mapped.append(new_trial)
+    study.add_trials(mapped)
+
+    enqueued = enqueue_defaults and bool(defaults)
+    if enqueued:
+        study.enqueue_trial(defaults)
+
+    return WarmStartInfo(len(mapped), skipped, enqueued)
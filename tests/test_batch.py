@@ -0,0 +1,123 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pickle
+
+import optuna
+import pytest
+
+from omegatuna import OmegaTuna
+from omegatuna.resolvers import suggest_all
+
+config = {f"p{i}": f"${{ot.int: {{low: 0, high: {i + 10}}}}}" for i in range(20)}
+
+
+@pytest.fixture(params=["inmemory", "sqlite"])
+def storage(request, tmpdir):
+    if request.param == "inmemory":
+        return None
+    return f"sqlite:///{tmpdir.join('study.db')}"
+
+
+def test_suggest_all(storage) -> None:
+    study = optuna.create_study(storage=storage)
+    for _ in range(3):
+        trial = study.ask()
+        conf = OmegaTuna.create(config, trial=trial)
+        params = suggest_all(conf)
+        study.tell(trial, 0.0)
+
+        assert params == trial.params
+        assert all(conf[key] == params[key] for key in config)
+
+    if storage is None:
+        return
+    reloaded = optuna.load_study(study_name=study.study_name, storage=storage)
+    assert [t.params for t in reloaded.trials] == [t.params for t in study.trials]
+
+
+def test_single_transaction(tmpdir) -> None:
+    storage = optuna.storages.get_storage(f"sqlite:///{tmpdir.join('study.db')}")
+    study = optuna.create_study(storage=storage)
+
+    # The first trial inserts the distributions of the parameters.
+    trial = study.ask()
+    OmegaTuna.create(config, trial=trial, eager=True)
+    study.tell(trial, 0.0)
+
+    n_updates = 0
+    update_trial = storage._backend._update_trial
+
+    def _update_trial(*args, **kwargs):
+        nonlocal n_updates
+        n_updates += 1
+        return update_trial(*args, **kwargs)
+
+    storage._backend._update_trial = _update_trial
+
+    trial = study.ask()
+    n_updates = 0
+    conf = OmegaTuna.create(config, trial=trial, eager=True)
+    assert n_updates == 1
+
+    template = OmegaTuna.compile(config)
+    trial = study.ask()
+    n_updates = 0
+    conf = template.instantiate(trial)
+    assert n_updates == 1
+    assert all(conf[key] == trial.params[key] for key in config)
+
+
+def test_storage_is_restored(tmpdir) -> None:
+    study = optuna.create_study(storage=f"sqlite:///{tmpdir.join('study.db')}")
+    trial = study.ask()
+    conf = OmegaTuna.create(config, trial=trial, eager=True)
+    study.tell(trial, 0.0)
+
+    assert "_flush_trial" not in vars(study._storage)
+    reloaded = pickle.loads(pickle.dumps(study))
+    assert reloaded.trials[0].params == {key: conf[key] for key in config}
+
+
+def test_dependent_nodes(tmpdir) -> None:
+    dependent = {
+        "hidden": "${ot.int: hidden, {low: 32, high: 64}}",
+        "low_dim": "${ot.int: low_dim, {low: 1, high: ${hidden}}}",
+    }
+    storage = optuna.storages.get_storage(f"sqlite:///{tmpdir.join('study.db')}")
+    study = optuna.create_study(storage=storage)
+    # The first trial inserts the distributions of the parameters.
+    trial = study.ask()
+    OmegaTuna.create(dependent, trial=trial, eager=True)
+    study.tell(trial, 0.0)
+    study.enqueue_trial({"hidden": 60})
+    trial = study.ask()
+
+    n_updates = 0
+    update_trial = storage._backend._update_trial
+
+    def _update_trial(*args, **kwargs):
+        nonlocal n_updates
+        n_updates += 1
+        return update_trial(*args, **kwargs)
+
+    storage._backend._update_trial = _update_trial
+    conf = OmegaTuna.create(dependent, trial=trial, eager=True)
+
+    assert n_updates == 1
+    assert conf.hidden == 60
+    assert 1 <= conf.low_dim <= 60
+    assert trial.distributions[
+        "low_dim"
+    ] == optuna.distributions.IntUniformDistribution(1, 60)
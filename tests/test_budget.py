@@ -0,0 +1,180 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import optuna
+import pytest
+from optuna.trial import FixedTrial, TrialState
+
+from omegatuna import OmegaTuna
+from omegatuna.resolvers import collect_specs, rung_budget, search_space
+
+yaml_string = """
+lr: ${ot.float:lr, {low:0.001, high:0.1, log:true}}
+train:
+  epochs: ${ot.budget:{low:1, high:27}}
+  subsample: ${ot.budget:{low:0.1, high:1.0, reduction_factor:2}}
+"""
+
+
+def test_rung_budget() -> None:
+    assert [rung_budget(1, 27, rung) for rung in range(5)] == [1, 4, 16, 27, 27]
+    assert rung_budget(1, 10, 1, reduction_factor=2, min_early_stopping_rate=1) == 4
+    assert rung_budget(0.25, 1.0, 1, reduction_factor=2) == 0.5
+
+
+def test_without_pruning() -> None:
+    conf = OmegaTuna.create(yaml_string)
+    assert conf.train.epochs == 27
+    assert conf.train.subsample == 1.0
+
+    conf = OmegaTuna.create(yaml_string, trial=FixedTrial({"lr": 0.01}))
+    assert conf.train.epochs == 27
+
+    study = optuna.create_study()
+    conf = OmegaTuna.create(yaml_string, trial=study.ask())
+    assert conf.train.epochs == 27
+
+
+def test_not_a_parameter() -> None:
+    conf = OmegaTuna.create(yaml_string)
+    assert set(collect_specs(conf)) == {("lr",)}
+    assert set(search_space(conf)[0]) == {"lr"}
+
+    trial = FixedTrial({"lr": 0.01})
+    OmegaTuna.create(yaml_string, trial=trial, eager=True)
+    assert set(trial.params) == {"lr"}
+
+
+@pytest.mark.parametrize("eager", [False, True])
+def test_successive_halving(eager) -> None:
+    study = optuna.create_study(
+        pruner=optuna.pruners.SuccessiveHalvingPruner(min_resource=1)
+    )
+    # Later trials are worse than the first one, and pruned at the first rung.
+    for lr in [0.001, 0.01, 0.1]:
+        study.enqueue_trial({"lr": lr})
+    budgets = []
+
+    def objective(trial):
+        conf = OmegaTuna.create(yaml_string, trial=trial, eager=eager)
+        trial_budgets = []
+        step = 0
+        while step < conf.train.epochs:
+            trial_budgets.append((conf.train.epochs, conf.train.subsample))
+            step += 1
+            trial.report(step * conf.lr, step)
+            if trial.should_prune():
+                budgets.append(trial_budgets)
+                raise optuna.TrialPruned()
+        budgets.append(trial_budgets)
+        return step * conf.lr
+
+    study.optimize(objective, n_trials=3)
+
+    # The default reduction factor of the pruner is 4.
+    assert budgets[0] == (
+        [(1, 0.1)] + [(4, 0.2)] * 3 + [(16, 0.4)] * 12 + [(27, 0.8)] * 11
+    )
+    for trial, trial_budgets in zip(study.trials, budgets):
+        assert len(trial_budgets) == trial.last_step
+        n_rungs = sum(key.startswith("completed_rung_") for key in trial.system_attrs)
+        if trial.state == TrialState.PRUNED:
+            assert trial.last_step == rung_budget(1, 27, n_rungs - 1, 4)
+        else:
+            assert trial.last_step == 27
+    assert [t.state for t in study.trials] == [TrialState.COMPLETE] + [
+        TrialState.PRUNED
+    ] * 2
+
+
+def test_frozen_trial() -> None:
+    study = optuna.create_study(
+        pruner=optuna.pruners.SuccessiveHalvingPruner(min_resource=1)
+    )
+
+    def objective(trial):
+        conf = OmegaTuna.create(yaml_string, trial=trial)
+        step = 0
+        while step < conf.train.epochs:
+            step += 1
+            trial.report(1.0, step)
+            trial.should_prune()
+        return 1.0
+
+    study.optimize(objective, n_trials=1)
+    frozen = study.trials[0]
+    assert frozen.last_step == 27
+
+    conf = OmegaTuna.from_frozen_trials(yaml_string, [frozen])[0]
+    assert conf.train.epochs == 27
+    assert conf.train.subsample == pytest.approx(0.8)
+
+
+def test_hyperband() -> None:
+    pruner = optuna.pruners.HyperbandPruner(min_resource=1, max_resource=27)
+    study = optuna.create_study(pruner=pruner)
+    seen = []
+
+    def objective(trial):
+        conf = OmegaTuna.create(yaml_string, trial=trial)
+        step = 0
+        while step < conf.train.epochs:
+            step += 1
+            trial.report(conf.lr, step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        seen.append((trial.number, conf.train.epochs))
+        return conf.lr
+
+    study.optimize(objective, n_trials=10)
+
+    assert pruner._pruners
+    assert all(epochs == 27 for _, epochs in seen)
+    for trial in study.trials:
+        bracket = pruner._get_bracket_id(study, trial)
+        n_rungs = sum(key.startswith("completed_rung_") for key in trial.system_attrs)
+        if trial.state == TrialState.PRUNED:
+            assert trial.last_step == rung_budget(1, 27, n_rungs - 1, 3, bracket)
+
+
+def test_hyperband_frozen_trials() -> None:
+    pruner = optuna.pruners.HyperbandPruner(min_resource=1, max_resource=27)
+    study = optuna.create_study(pruner=pruner)
+
+    def objective(trial):
+        conf = OmegaTuna.create(yaml_string, trial=trial)
+        step = 0
+        while step < conf.train.epochs:
+            step += 1
+            trial.report(conf.lr, step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return conf.lr
+
+    study.optimize(objective, n_trials=10)
+
+    confs = OmegaTuna.from_frozen_trials(yaml_string, study.trials)
+    for trial, conf in zip(study.trials, confs):
+        bracket = pruner._get_bracket_id(study, trial)
+        n_rungs = sum(key.startswith("completed_rung_") for key in trial.system_attrs)
+        if n_rungs:
+            assert trial.system_attrs["omegatuna.budget_schedule"] == [3, bracket]
+            assert conf.train.epochs == rung_budget(1, 27, n_rungs, 3, bracket)
+
+
+def test_invalid() -> None:
+    with pytest.raises(Exception, match="high"):
+        OmegaTuna.create({"x": "${ot.budget:{low:1}}"}).x
+    with pytest.raises(Exception, match="Unknown"):
+        OmegaTuna.create({"x": "${ot.budget:{low:1, high:2, eta:3}}"}).x
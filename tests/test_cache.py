@@ -0,0 +1,79 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from typing import Any
+
+import optuna
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+
+
+class CountingTrial(FixedTrial):
+    def __init__(self, params) -> None:
+        super().__init__(params)
+        self.n_calls = 0
+
+    def _suggest(self, name: str, distribution: Any) -> Any:
+        self.n_calls += 1
+        return super()._suggest(name, distribution)
+
+
+def test_cache_hits() -> None:
+    trial = CountingTrial({"param_int": 3, "param_float": 0.3})
+    d = {
+        "param_int": "${ot.int: {low: -10, high: 10}}",
+        "param_float": "${ot.float: {low: -10.0, high: 10.0}}",
+    }
+    conf = OmegaTuna.create(d, trial=trial)
+
+    for _ in range(5):
+        assert conf.param_int == 3
+        assert conf.param_float == 0.3
+
+    assert trial.n_calls == 2
+    info = OmegaTuna.cache_info(conf)
+    assert info.misses == 2
+    assert info.hits == 8
+    assert info.currsize == 2
+
+
+def test_cache_shared_name() -> None:
+    trial = CountingTrial({"param_int": 3})
+    d = {
+        "a": "${ot.int: param_int, {low: -10, high: 10}}",
+        "b": "${ot.int: param_int, {low: -10, high: 10}}",
+    }
+    conf = OmegaTuna.create(d, trial=trial)
+
+    assert conf.a == conf.b == 3
+    assert trial.n_calls == 1
+
+
+def test_cache_per_trial() -> None:
+    d = {"param_int": "${ot.int: {low: -10, high: 10}}"}
+    study = optuna.create_study()
+    for _ in range(3):
+        trial = study.ask()
+        conf = OmegaTuna.create(d, trial=trial)
+        assert conf.param_int == conf.param_int == trial.params["param_int"]
+        assert OmegaTuna.cache_info(conf).misses == 1
+
+
+def test_cache_info_without_trial() -> None:
+    conf = OmegaTuna.create(
+        {"param_int": "${ot.int: {low: -10, high: 10, default: 1}}"}
+    )
+    assert conf.param_int == 1
+    assert OmegaTuna.cache_info(conf) == (0, 0, 0)
@@ -0,0 +1,146 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import optuna
+import pytest
+from omegaconf.errors import MissingMandatoryValue
+from optuna.trial import FixedTrial
+
+import omegatuna
+from omegatuna import OmegaTuna
+from omegatuna.constraints import evaluate, rejection_rates
+
+yaml_string = """
+max_tokens: 4096
+train:
+  batch_size: ${ot.int:batch_size, {low:1, high:64}}
+  grad_accum: ${ot.int:grad_accum, {low:1, high:8}}
+model:
+  hidden_dim: ${ot.int:hidden_dim, {low:8, high:64}}
+  low_dim: ${ot.int:low_dim, {low:8, high:64}}
+  expensive: ${ot.float:expensive, {low:0.0, high:1.0}}
+_constraints_:
+  tokens: train.batch_size * train.grad_accum * 128 <= max_tokens
+  low_dim: model.low_dim <= model.hidden_dim
+"""
+
+
+def params(batch_size=4, grad_accum=2, hidden_dim=32, low_dim=16):
+    return {
+        "batch_size": batch_size,
+        "grad_accum": grad_accum,
+        "hidden_dim": hidden_dim,
+        "low_dim": low_dim,
+        "expensive": 0.5,
+    }
+
+
+def test_satisfied() -> None:
+    conf = OmegaTuna.create(yaml_string, trial=FixedTrial(params()))
+    assert conf.model.low_dim == 16
+
+
+@pytest.mark.parametrize(
+    "kwargs, name",
+    [({"batch_size": 64}, "tokens"), ({"low_dim": 64}, "low_dim")],
+)
+def test_violated(kwargs, name) -> None:
+    trial = FixedTrial(params(**kwargs))
+    with pytest.raises(optuna.TrialPruned, match=name):
+        OmegaTuna.create(yaml_string, trial=trial)
+    assert trial.user_attrs["omegatuna.constraint_violated"] == name
+
+
+def test_only_used_params_are_suggested() -> None:
+    study = optuna.create_study()
+    study.enqueue_trial(params(batch_size=64))
+    trial = study.ask()
+    with pytest.raises(optuna.TrialPruned):
+        OmegaTuna.create(yaml_string, trial=trial)
+
+    assert set(trial.params) == {"batch_size", "grad_accum"}
+
+
+def test_template_and_merge() -> None:
+    trial = FixedTrial(params(low_dim=64))
+    with pytest.raises(optuna.TrialPruned):
+        OmegaTuna.compile(yaml_string).instantiate(trial)
+    with pytest.raises(optuna.TrialPruned):
+        OmegaTuna.merge(
+            OmegaTuna.create(yaml_string), OmegaTuna.create({"x": 1}, trial=trial)
+        )
+
+
+def test_layers() -> None:
+    layer = {
+        "a": "${ot.int:a, {low:0, high:10}}",
+        "b": "???",
+        "_constraints_": {"c": "a < b"},
+    }
+    conf = OmegaTuna.create(layer, trial=FixedTrial({"a": 3}))
+    assert OmegaTuna.merge(conf, {"b": 5}).a == 3
+
+    trial = FixedTrial({"a": 3})
+    conf = OmegaTuna.create({k: v for k, v in layer.items() if k != "b"}, trial=trial)
+    with pytest.raises(optuna.TrialPruned):
+        OmegaTuna.merge(conf, {"b": 2})
+    assert trial.user_attrs["omegatuna.constraint_violated"] == "c"
+
+    conf = OmegaTuna.create(layer, trial=FixedTrial({"a": 3}))
+    with pytest.raises(MissingMandatoryValue):
+        OmegaTuna.merge(conf, {"d": 1})
+
+
+def test_merge_stack_bind() -> None:
+    stack = OmegaTuna.merge_stack(OmegaTuna.create(yaml_string))
+    with stack.bind(FixedTrial(params())) as conf:
+        assert conf.model.low_dim == 16
+
+    trial = FixedTrial(params(batch_size=64))
+    with pytest.raises(optuna.TrialPruned, match="tokens"):
+        with stack.bind(trial):
+            pass
+    assert trial.user_attrs["omegatuna.constraint_violated"] == "tokens"
+
+
+def test_rejection_rates() -> None:
+    stats = omegatuna.enable_stats()
+    try:
+        study = optuna.create_study()
+
+        def objective(trial):
+            OmegaTuna.create(yaml_string, trial=trial)
+            return 0.0
+
+        for kwargs in [{}, {"batch_size": 64}, {"low_dim": 64}, {"batch_size": 64}]:
+            study.enqueue_trial(params(**kwargs))
+        study.optimize(objective, n_trials=4)
+
+        assert rejection_rates(study) == {"tokens": 0.5, "low_dim": 0.25}
+        assert stats.constraint_rejections == {"tokens": 2, "low_dim": 1}
+        assert stats.rejection_rates() == {"tokens": 0.5, "low_dim": 0.5}
+    finally:
+        omegatuna.disable_stats()
+
+
+def test_evaluate() -> None:
+    conf = OmegaTuna.create({"a": 2, "b": [1, 2, 3], "c": {"d": "x"}})
+
+    assert evaluate("max(a, 1) in b and c.d == 'x'", conf)
+    assert evaluate("b[0] + -a < 0 if len(b) == 3 else False", conf)
+    assert not evaluate("not a", conf)
+    with pytest.raises(ValueError):
+        evaluate("__import__('os')", conf)
+    with pytest.raises(ValueError):
+        evaluate("[x for x in b]", conf)
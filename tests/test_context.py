@@ -0,0 +1,78 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import optuna
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+
+config = OmegaTuna.create(
+    {
+        "param_int": "${ot.int: {low: 0, high: 100, default: -1}}",
+        "alias": "${param_int}",
+    }
+)
+
+
+def test_use_trial() -> None:
+    with OmegaTuna.use_trial(FixedTrial({"param_int": 1})) as cache:
+        assert config.param_int == 1
+        assert config.alias == 1
+        with OmegaTuna.use_trial(FixedTrial({"param_int": 2})):
+            assert config.param_int == 2
+        assert config.param_int == 1
+        assert cache.info().misses == 1
+
+    assert config.param_int == -1
+
+
+def test_precedence() -> None:
+    conf = OmegaTuna.create(config, trial=FixedTrial({"param_int": 1}))
+    with OmegaTuna.use_trial(FixedTrial({"param_int": 2})):
+        assert conf.param_int == 2
+    assert conf.param_int == 1
+
+
+def test_threads() -> None:
+    def objective(trial: optuna.Trial) -> float:
+        with OmegaTuna.use_trial(trial):
+            for _ in range(10):
+                assert config.param_int == trial.params["param_int"]
+            return config.alias
+
+    study = optuna.create_study()
+    study.optimize(objective, n_trials=20, n_jobs=4)
+    assert all(t.value == t.params["param_int"] for t in study.trials)
+
+    def read(value: int) -> int:
+        with OmegaTuna.use_trial(FixedTrial({"param_int": value})):
+            return config.alias
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(read, range(50))) == list(range(50))
+
+
+def test_asyncio() -> None:
+    async def read(value: int) -> int:
+        with OmegaTuna.use_trial(FixedTrial({"param_int": value})):
+            await asyncio.sleep(0.001 * (value % 3))
+            return config.param_int
+
+    async def main():
+        return await asyncio.gather(*(read(i) for i in range(10)))
+
+    assert asyncio.run(main()) == list(range(10))
@@ -0,0 +1,90 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from dataclasses import dataclass
+
+import pytest
+from optuna.trial import BaseTrial, FixedTrial
+
+from omegatuna import SI, OmegaTuna
+
+
+@pytest.fixture(params=[(3, 0.3), (2, 0.2)])
+def trial(request) -> BaseTrial:
+    p_int, p_float = request.param
+    return FixedTrial({"param_int": p_int, "param_float": p_float})
+
+
+yaml_string = """
+param_int: ${ot.int:{low:-10, high:10}}
+param_float: '${ot.float: {low: -10.0, high: 10.0}}'
+alias: ${param_int}
+"""
+
+
+def _assert_resolved(conf, trial: BaseTrial) -> None:
+    assert not OmegaTuna.is_interpolation(conf, "param_int")
+    assert not OmegaTuna.is_interpolation(conf, "param_float")
+    assert conf.param_int == trial.suggest_int("param_int", -10, 10)
+    assert conf.param_float == trial.suggest_float("param_float", -10, 10)
+
+
+def test_create(trial: BaseTrial) -> None:
+    conf = OmegaTuna.create(yaml_string, trial=trial, eager=True)
+    _assert_resolved(conf, trial)
+    assert not OmegaTuna.is_interpolation(conf, "alias")
+    assert conf.alias == conf.param_int
+    assert OmegaTuna.cache_info(conf).misses == 2
+
+
+def test_load(trial: BaseTrial, tmpdir) -> None:
+    path = tmpdir.join("config.yml")
+    path.write(yaml_string)
+    conf = OmegaTuna.load(str(path), trial=trial, eager=True)
+    _assert_resolved(conf, trial)
+
+
+def test_from_dotlist(trial: BaseTrial) -> None:
+    d = [
+        "param_int=${ot.int:{low:-10, high:10}}",
+        "param_float=${ot.float:{low:-10.0, high:10.0}}",
+    ]
+    conf = OmegaTuna.from_dotlist(d, trial=trial, eager=True)
+    _assert_resolved(conf, trial)
+
+
+@dataclass
+class StructuredConf:
+    param_int: int = SI("${ot.int: {low: -10, high: 10}}")
+    param_float: float = SI("${ot.float: {low: -10.0, high: 10.0}}")
+
+
+def test_structured(trial: BaseTrial) -> None:
+    conf = OmegaTuna.structured(StructuredConf, trial=trial, eager=True)
+    _assert_resolved(conf, trial)
+
+
+def test_merge(trial: BaseTrial) -> None:
+    conf = OmegaTuna.create({"param_int": "${ot.int:{low:-10, high:10}}"}, trial=trial)
+    conf2 = OmegaTuna.create({"param_float": "${ot.float:{low:-10.0, high:10.0}}"})
+    merged = OmegaTuna.merge(conf, conf2, eager=True)
+    _assert_resolved(merged, trial)
+
+
+def test_defaults() -> None:
+    conf = OmegaTuna.create(
+        {"param_int": "${ot.int:{low:-10, high:10, default:1}}"}, eager=True
+    )
+    assert not OmegaTuna.is_interpolation(conf, "param_int")
+    assert conf.param_int == 1
@@ -0,0 +1,119 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import json
+
+import numpy as np
+import optuna
+import pytest
+
+from omegatuna import OmegaTuna
+from omegatuna.export import export_jsonl, export_npz, iter_trials
+
+yaml_string = """
+model:
+  param_int: ${ot.int:param_int, {low:-10, high:10}}
+  layers:
+    - '${ot.float: param_float, {low: -10.0, high: 10.0}}'
+  alias: ${model.param_int}
+param_cat: '${ot.categorical: {choices: [null, true, test]}}'
+"""
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def study(request, tmpdir):
+    storage = None
+    if request.param == "sqlite":
+        storage = f"sqlite:///{tmpdir.join('study.db')}"
+    study = optuna.create_study(storage=storage)
+
+    def objective(trial):
+        conf = OmegaTuna.create(yaml_string, trial=trial)
+        value = conf.model.param_int + conf.model.layers[0] + len(str(conf.param_cat))
+        if trial.number == 2:
+            raise optuna.TrialPruned()
+        return value
+
+    study.optimize(objective, n_trials=5)
+    return study
+
+
+def test_iter_trials(study) -> None:
+    trials = list(iter_trials(study, page_size=2))
+
+    assert [t.number for t in trials] == list(range(5))
+    assert [t.params for t in trials] == [t.params for t in study.trials]
+
+    states = [optuna.trial.TrialState.PRUNED]
+    assert [t.number for t in iter_trials(study, states=states)] == [2]
+
+
+def test_export_jsonl(study, tmpdir) -> None:
+    path = str(tmpdir.join("trials.jsonl"))
+    assert export_jsonl(OmegaTuna.compile(yaml_string), study, path) == 5
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    for record, trial in zip(records, study.trials):
+        assert record["number"] == trial.number
+        assert record["state"] == trial.state.name
+        assert record["params"] == trial.params
+        assert record["config"]["model"]["param_int"] == trial.params["param_int"]
+        assert record["config"]["model"]["alias"] == trial.params["param_int"]
+
+
+def test_export_npz(study, tmpdir) -> None:
+    path = str(tmpdir.join("trials.npz"))
+    assert export_npz(OmegaTuna.create(yaml_string), study, path) == 5
+
+    data = np.load(path)
+    assert set(data.files) == {
+        "number",
+        "value",
+        "model.param_int",
+        "model.layers.0",
+        "param_cat",
+    }
+    trials = study.trials
+    np.testing.assert_array_equal(data["number"], [t.number for t in trials])
+    np.testing.assert_array_equal(
+        data["model.param_int"], [t.params["param_int"] for t in trials]
+    )
+    assert list(data["param_cat"]) == [str(t.params["param_cat"]) for t in trials]
+    assert np.isnan(data["value"][2])
+
+
+def test_export_npz_missing_params(tmpdir) -> None:
+    study = optuna.create_study()
+    study.optimize(lambda t: t.suggest_int("param_int", -10, 10), n_trials=2)
+
+    path = str(tmpdir.join("trials.npz"))
+    export_npz(OmegaTuna.create(yaml_string), study.trials, path)
+
+    data = np.load(path)
+    assert np.isnan(data["model.layers.0"]).all()
+    assert list(data["param_cat"]) == ["", ""]
+
+
+def test_export_jsonl_missing_params(tmpdir) -> None:
+    study = optuna.create_study()
+    study.optimize(lambda t: t.suggest_int("param_int", -10, 10), n_trials=1)
+
+    path = str(tmpdir.join("trials.jsonl"))
+    export_jsonl(OmegaTuna.create(yaml_string), study, path)
+
+    with open(path) as f:
+        config = json.loads(f.readline())["config"]
+    assert config["model"]["param_int"] == study.trials[0].params["param_int"]
+    assert config["model"]["layers"] == [None]
@@ -0,0 +1,51 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import subprocess
+import sys
+
+
+def _run(code: str) -> None:
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_optuna_not_imported() -> None:
+    _run(
+        """
+import sys
+import omegatuna
+assert "optuna" not in sys.modules
+"""
+    )
+
+
+def test_defaults_without_optuna() -> None:
+    _run(
+        """
+import sys
+sys.modules["optuna"] = None  # make `import optuna` fail
+
+from omegatuna import OmegaTuna
+
+conf = OmegaTuna.create(
+    {
+        "param_int": "${ot.int: {low: -10, high: 10, default: -1}}",
+        "param_cat": "${ot.categorical: {choices: [a, b], default: b}}",
+    }
+)
+assert conf.param_int == -1
+assert conf.param_cat == "b"
+assert OmegaTuna.compile(conf).instantiate().param_int == -1
+"""
+    )
@@ -0,0 +1,93 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+
+import pytest
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna, disable_load_cache, enable_load_cache
+from omegatuna.load_cache import get_load_cache
+
+yaml_string = """
+model:
+  param_int: ${ot.int:param_int, {low:-10, high:10}}
+"""
+
+
+@pytest.fixture
+def cache():
+    cache = enable_load_cache(maxsize=2)
+    yield cache
+    disable_load_cache()
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "config.yml"
+    path.write_text(yaml_string)
+    return path
+
+
+def test_load_cache_hit(cache, path) -> None:
+    a = OmegaTuna.load(path, trial=FixedTrial({"param_int": 1}))
+    b = OmegaTuna.load(str(path), trial=FixedTrial({"param_int": 2}))
+
+    assert a.model.param_int == 1
+    assert b.model.param_int == 2
+    assert cache.info() == (1, 1, 1)
+
+
+def test_load_cache_returns_copies(cache, path) -> None:
+    a = OmegaTuna.load(path)
+    a.model.param_int = 5
+
+    assert OmegaTuna.load(path, trial=FixedTrial({"param_int": 1})).model.param_int == 1
+
+
+def test_load_cache_modified_file(cache, path) -> None:
+    OmegaTuna.load(path)
+    path.write_text("model: {param_int: 0, extra: 1}")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert OmegaTuna.load(path).model.extra == 1
+    assert cache.info() == (0, 2, 1)
+
+
+def test_load_cache_eviction(cache, tmp_path) -> None:
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"{i}.yml")
+        paths[-1].write_text(f"value: {i}")
+        OmegaTuna.load(paths[-1])
+
+    assert cache.info().currsize == 2
+    OmegaTuna.load(paths[0])
+    assert cache.info().misses == 4
+
+
+def test_load_cache_invalidate(cache, path) -> None:
+    OmegaTuna.load(path)
+    cache.invalidate(path)
+    assert cache.info().currsize == 0
+
+    OmegaTuna.load(path)
+    cache.invalidate()
+    assert cache.info().currsize == 0
+
+
+def test_load_cache_disabled(path) -> None:
+    assert get_load_cache() is None
+    assert "param_int" in OmegaTuna.load(path).model
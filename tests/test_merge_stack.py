@@ -0,0 +1,81 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pytest
+from omegaconf.errors import ReadonlyConfigError
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+
+base = {
+    "model": {"param_int": "${ot.int:param_int, {low:-10, high:10}}", "depth": 2},
+    "data": {"path": "/data"},
+}
+model = {"model": {"param_float": "${ot.float:param_float, {low:0.0, high:1.0}}"}}
+
+
+@pytest.fixture
+def stack():
+    return OmegaTuna.merge_stack(base, OmegaTuna.create(model))
+
+
+@pytest.fixture
+def trial():
+    return FixedTrial({"param_int": 3, "param_float": 0.3})
+
+
+def test_merge_stack_merge(stack, trial) -> None:
+    conf = stack.merge({"model": {"depth": 4}}, trial=trial)
+
+    assert conf.model.param_int == 3
+    assert conf.model.param_float == 0.3
+    assert conf.model.depth == 4
+    assert conf.data.path == "/data"
+    assert stack.config.model.depth == 2
+
+    conf.data.path = "/other"
+    assert stack.config.data.path == "/data"
+
+
+def test_merge_stack_trial_of_layers(stack, trial) -> None:
+    conf = stack.merge(OmegaTuna.create({"data": {"n": 1}}, trial=trial))
+    assert conf.model.param_int == 3
+
+    conf = stack.merge(trial=trial, eager=True)
+    assert conf.model.param_int == 3
+
+    with pytest.raises(RuntimeError):
+        stack.merge(
+            OmegaTuna.create({}, trial=trial),
+            OmegaTuna.create({}, trial=FixedTrial({})),
+        )
+
+
+def test_merge_stack_bind(stack, trial) -> None:
+    with stack.bind(trial) as conf:
+        assert conf is stack.config
+        assert conf.model.param_int == 3
+
+    with stack.bind(FixedTrial({"param_int": 4})) as conf:
+        assert conf.model.param_int == 4
+
+
+def test_merge_stack_is_read_only(stack) -> None:
+    with pytest.raises(ReadonlyConfigError):
+        stack.config.model.depth = 3
+
+
+def test_merge_stack_rejects_trial_bound_layers(trial) -> None:
+    with pytest.raises(ValueError):
+        OmegaTuna.merge_stack(OmegaTuna.create(base, trial=trial))
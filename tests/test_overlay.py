@@ -0,0 +1,115 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pickle
+
+import pytest
+from optuna.distributions import IntUniformDistribution, UniformDistribution
+from optuna.trial import FixedTrial, create_trial
+
+from omegatuna import OmegaTuna
+
+yaml_string = """
+model:
+  param_int: ${ot.int:param_int, {low:-10, high:10}}
+  layers:
+    - '${ot.float: param_float, {low: -10.0, high: 10.0}}'
+    - 4
+  alias: ${model.param_int}
+data:
+  path: /data
+"""
+
+
+@pytest.fixture
+def base():
+    return OmegaTuna.create(yaml_string)
+
+
+def test_overlay_reads(base) -> None:
+    conf = OmegaTuna.overlay(base, {"param_int": 3, "param_float": 0.3})
+
+    assert conf.model.param_int == 3
+    assert conf["model"]["layers"][0] == 0.3
+    assert list(conf.model.layers) == [0.3, 4]
+    assert conf.model.alias == 3
+    assert conf.data.path == "/data"
+    assert conf.get("missing", 1) == 1
+    assert "model" in conf
+    assert len(conf) == 2
+    assert list(conf) == ["model", "data"]
+
+
+def test_overlays_share_base(base) -> None:
+    a = OmegaTuna.overlay(base, {"param_int": 1, "param_float": 0.1})
+    frozen = create_trial(
+        params={"param_int": 2, "param_float": 0.2},
+        distributions={
+            "param_int": IntUniformDistribution(-10, 10),
+            "param_float": UniformDistribution(-10.0, 10.0),
+        },
+        value=0.0,
+    )
+    b = OmegaTuna.overlay(base, frozen)
+
+    assert a.model.param_int == 1
+    assert b.model.param_int == 2
+    assert a.model._base is b.model._base
+    assert OmegaTuna.to_container(base)["model"]["param_int"].startswith("${ot.int")
+
+
+def test_overlay_to_container_and_yaml(base) -> None:
+    conf = OmegaTuna.overlay(base, {"param_int": 3, "param_float": 0.3})
+    expected = OmegaTuna.create(
+        yaml_string, trial=FixedTrial({"param_int": 3, "param_float": 0.3})
+    )
+
+    assert OmegaTuna.to_container(conf, resolve=True) == OmegaTuna.to_container(
+        expected, resolve=True
+    )
+    assert OmegaTuna.to_yaml(conf, resolve=True) == OmegaTuna.to_yaml(
+        expected, resolve=True
+    )
+    assert conf == OmegaTuna.to_container(expected, resolve=True)
+
+
+def test_overlay_is_read_only(base) -> None:
+    conf = OmegaTuna.overlay(base, {"param_int": 3, "param_float": 0.3})
+
+    with pytest.raises(TypeError):
+        conf.data = 1
+    with pytest.raises(TypeError):
+        conf["data"] = 1
+
+
+def test_overlay_missing_param(base) -> None:
+    conf = OmegaTuna.overlay(base, {"param_float": 0.3})
+
+    with pytest.raises(Exception, match="param_int"):
+        conf.model.param_int
+
+
+def test_overlay_of_trial_bound_config() -> None:
+    conf = OmegaTuna.create(yaml_string, trial=FixedTrial({"param_int": 3}))
+
+    with pytest.raises(ValueError):
+        OmegaTuna.overlay(conf, {"param_int": 3})
+
+
+def test_overlay_pickle(base) -> None:
+    conf = pickle.loads(
+        pickle.dumps(OmegaTuna.overlay(base, {"param_int": 3, "param_float": 0.3}))
+    )
+
+    assert conf.model.param_int == 3
@@ -0,0 +1,80 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pickle
+
+import pytest
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+from omegatuna.resolvers import parse_spec
+
+
+def test_parse_spec() -> None:
+    spec = parse_spec("${ot.int: param_int, {low: -10, high: 10, default: 1}}", "p")
+    assert spec.resolver == "ot.int"
+    assert spec.name == "param_int"
+    assert spec.kwargs == {"low": -10, "high": 10}
+    assert spec.default == 1
+
+    spec = parse_spec("${ot.categorical: {choices: [a, b]}}", "p")
+    assert spec.name == "p"
+    assert spec.kwargs == {"choices": ["a", "b"]}
+    assert not spec.has_default
+
+    with pytest.raises(TypeError):
+        spec.kwargs["choices"] = []
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "plain",
+        "${other}",
+        "run_${ot.int: {low: 0, high: 1}}",
+        "${ot.int: {low: 0, high: ${max}}}",
+        "${ot.int: {low: 0, high: ${oc.env:MAX}}}",
+        "${ot.int: {low: 0, high: 1}}_${ot.int: {low: 0, high: 1}}",
+    ],
+)
+def test_not_a_spec(value: str) -> None:
+    assert parse_spec(value, "p") is None
+
+
+def test_cache_hits() -> None:
+    value = "${ot.float: {low: 0.0, high: 1.0, default: 0.5}}"
+    conf = OmegaTuna.create({"a": value})
+    conf.a
+    hits = parse_spec.cache_info().hits
+    for _ in range(3):
+        assert conf.a == 0.5
+    assert parse_spec.cache_info().hits == hits + 3
+
+
+def test_pickle() -> None:
+    for value in [
+        "${ot.int: {low: 0, high: 1}}",
+        "${ot.int: {low: 0, high: 1, default: 0}}",
+    ]:
+        spec = parse_spec(value, "p")
+        assert pickle.loads(pickle.dumps(spec)) == spec
+
+
+def test_nested_interpolation() -> None:
+    d = {"max": 5, "param_int": "${ot.int: {low: 0, high: ${max}}}"}
+    template = OmegaTuna.compile(d)
+    assert template.specs[("param_int",)].kwargs == {"low": 0, "high": 5}
+
+    conf = OmegaTuna.create(d, trial=FixedTrial({"param_int": 3}))
+    assert conf.param_int == 3
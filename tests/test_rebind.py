@@ -0,0 +1,79 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pytest
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+
+config = {
+    "param_int": "${ot.int: {low: -10, high: 10, default: -1}}",
+    "model": {"size": 10, "alias": "${param_int}"},
+}
+
+
+def test_rebind() -> None:
+    conf = OmegaTuna.create(config, trial=FixedTrial({"param_int": 1}))
+    model = conf.model
+    assert conf.param_int == 1
+
+    for value in [2, 3]:
+        assert OmegaTuna.rebind(conf, FixedTrial({"param_int": value})) is conf
+        assert conf.model is model
+        assert conf.param_int == value
+        assert conf.model.alias == value
+        assert OmegaTuna.cache_info(conf).misses == 1
+
+    OmegaTuna.rebind(conf, None)
+    assert conf.param_int == -1
+
+
+def test_rebind_unbound() -> None:
+    conf = OmegaTuna.create(config)
+    OmegaTuna.rebind(conf, FixedTrial({"param_int": 2}))
+    assert conf.param_int == 2
+
+
+def test_rebind_resolved() -> None:
+    conf = OmegaTuna.create(config, trial=FixedTrial({"param_int": 1}), eager=True)
+    with pytest.raises(ValueError):
+        OmegaTuna.rebind(conf, FixedTrial({"param_int": 2}))
+
+    conf = OmegaTuna.compile(config).instantiate(FixedTrial({"param_int": 1}))
+    with pytest.raises(ValueError):
+        OmegaTuna.rebind(conf, FixedTrial({"param_int": 2}))
+
+
+def test_rebind_after_resolve() -> None:
+    conf = OmegaTuna.create(config, trial=FixedTrial({"param_int": 1}))
+    OmegaTuna.resolve(conf)
+    with pytest.raises(ValueError):
+        OmegaTuna.rebind(conf, FixedTrial({"param_int": 7}))
+    assert conf.param_int == 1
+
+    conf = OmegaTuna.create(config, trial=FixedTrial({"param_int": 1}))
+    OmegaTuna.resolve(conf.model)
+    with pytest.raises(ValueError):
+        OmegaTuna.rebind(conf, FixedTrial({"param_int": 7}))
+
+    conf = OmegaTuna.create(config)
+    with OmegaTuna.use_trial(FixedTrial({"param_int": 1})):
+        OmegaTuna.resolve(conf)
+    with pytest.raises(ValueError):
+        OmegaTuna.rebind(conf, FixedTrial({"param_int": 7}))
+
+    # Without a trial, only defaults are resolved.
+    conf = OmegaTuna.create(config)
+    OmegaTuna.resolve(conf)
+    OmegaTuna.rebind(conf, FixedTrial({"param_int": 7}))
@@ -0,0 +1,95 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pickle
+
+import optuna
+import pytest
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna, ResultCache
+
+config = {
+    "param_int": "${ot.int: {low: 0, high: 2}}",
+    "param_cat": "${ot.categorical: {choices: [a, b]}}",
+}
+
+
+@pytest.fixture
+def cache(tmpdir) -> ResultCache:
+    return ResultCache(str(tmpdir.join("results.db")))
+
+
+def test_wrap(cache: ResultCache) -> None:
+    calls = []
+
+    def objective(trial, conf) -> float:
+        calls.append((conf.param_int, conf.param_cat))
+        return conf.param_int + len(conf.param_cat)
+
+    wrapped = cache.wrap(objective)
+    template = OmegaTuna.compile(config)
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=0))
+    study.optimize(lambda trial: wrapped(trial, template.instantiate(trial)), 30)
+
+    assert len(calls) == len(set(calls)) <= 6
+    info = cache.info()
+    assert info.misses == len(calls)
+    assert info.hits == 30 - len(calls)
+    assert info.currsize == len(calls)
+    for trial in study.trials:
+        assert trial.value == trial.params["param_int"] + 1
+    assert sum(t.user_attrs["omegatuna.result_cache_hit"] for t in study.trials) == (
+        info.hits
+    )
+
+
+def test_lazy_config(cache: ResultCache) -> None:
+    wrapped = cache.wrap(lambda trial, conf: float(conf.param_int))
+    for _ in range(2):
+        trial = FixedTrial({"param_int": 1, "param_cat": "a"})
+        assert wrapped(trial, OmegaTuna.create(config, trial=trial)) == 1.0
+    assert cache.info() == (1, 1, 1)
+
+
+def test_namespace_and_config(tmpdir) -> None:
+    path = str(tmpdir.join("results.db"))
+    params = {"param_int": 1, "param_cat": "a"}
+
+    def evaluate(cache, obj, value):
+        trial = FixedTrial(params)
+        return cache.wrap(lambda trial, conf: value)(
+            trial, OmegaTuna.create(obj, trial=trial)
+        )
+
+    assert evaluate(ResultCache(path), config, 1.0) == 1.0
+    assert evaluate(ResultCache(path), config, 2.0) == 1.0
+    assert evaluate(ResultCache(path, namespace="other"), config, 3.0) == 3.0
+    assert evaluate(ResultCache(path), {**config, "epochs": 10}, 4.0) == 4.0
+    assert evaluate(ResultCache(path), {**config, "epochs": 20}, 5.0) == 5.0
+    assert ResultCache(path).info().currsize == 4
+
+
+def test_persistence(cache: ResultCache) -> None:
+    trial = FixedTrial({"param_int": 1, "param_cat": "a"})
+    conf = OmegaTuna.create(config, trial=trial)
+    cache.namespace = "objective"
+    cache.wrap(lambda trial, conf: 0.5)(trial, conf)
+
+    restored = pickle.loads(pickle.dumps(cache))
+    assert restored.namespace == "objective"
+    assert restored.get(restored.config_key(conf)) == 0.5
+
+    cache.clear()
+    assert cache.info() == (0, 0, 0)
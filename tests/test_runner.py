@@ -0,0 +1,83 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+import pickle
+import tempfile
+
+import optuna
+import pytest
+from optuna.trial import FixedTrial
+
+import omegatuna
+from omegatuna import OmegaTuna
+
+yaml_string = """
+x: '${ot.float: {low: -10.0, high: 10.0}}'
+n: ${ot.int:{low:0, high:3}}
+"""
+
+
+def objective(trial, conf) -> float:
+    assert conf.x == trial.params["x"]
+    return (conf.x - 2) ** 2 + conf.n
+
+
+@pytest.fixture
+def yaml_file(tmpdir):
+    path = tmpdir.join("config.yml")
+    path.write(yaml_string)
+    return str(path)
+
+
+def test_pickle_template() -> None:
+    template = pickle.loads(pickle.dumps(OmegaTuna.compile(yaml_string)))
+    conf = template.instantiate(FixedTrial({"x": 1.0, "n": 2}))
+    assert conf.x == 1.0
+    assert conf.n == 2
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_run(yaml_file: str, tmpdir, n_workers: int) -> None:
+    storage = f"sqlite:///{tmpdir.join('study.db')}"
+    study = omegatuna.run(objective, yaml_file, 6, n_workers, storage=storage)
+
+    assert len(study.trials) == 6
+    assert all(t.value is not None for t in study.trials)
+
+
+def test_temporary_storage(yaml_file: str, tmpdir, monkeypatch) -> None:
+    created = []
+
+    def mkdtemp() -> str:
+        path = str(tmpdir.mkdir(f"run{len(created)}"))
+        created.append(path)
+        return path
+
+    monkeypatch.setattr(tempfile, "mkdtemp", mkdtemp)
+    study = omegatuna.run(objective, yaml_file, 4, 2)
+
+    assert len(created) == 1
+    assert not os.path.exists(created[0])
+    assert len(study.trials) == 4
+    assert study.best_value is not None
+
+
+def test_workers_are_reseeded(yaml_file: str, tmpdir) -> None:
+    storage = f"sqlite:///{tmpdir.join('study.db')}"
+    sampler = optuna.samplers.RandomSampler(seed=0)
+    study = omegatuna.run(objective, yaml_file, 4, 2, storage=storage, sampler=sampler)
+
+    xs = [t.params["x"] for t in study.trials]
+    assert len(set(xs)) == len(xs)
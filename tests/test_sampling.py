@@ -0,0 +1,119 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import numpy as np
+import pytest
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+from omegatuna.sampling import rows
+
+yaml_string = """
+p_cat: '${ot.categorical: {choices: [null, true, 1, 0.3, test]}}'
+p_du: '${ot.discrete_uniform: {low: 0.0, high: 1.0, q: 0.25}}'
+p_float: '${ot.float: {low: -10.0, high: 10.0}}'
+p_float_step: '${ot.float: {low: 0.0, high: 1.0, step: 0.1}}'
+model:
+  p_int: '${ot.int: {low: -10, high: 10, step: 2}}'
+  p_int_log: '${ot.int: {low: 1, high: 100, log: true}}'
+p_lu: '${ot.loguniform: {low: 0.01, high: 10.0}}'
+p_float_log: '${ot.float: {low: 0.01, high: 10.0, log: true}}'
+"""
+
+
+@pytest.fixture
+def conf():
+    return OmegaTuna.create(yaml_string)
+
+
+def _check(samples, n: int) -> None:
+    assert all(len(values) == n for values in samples.values())
+    assert set(samples["p_cat"]) <= {None, True, 1, 0.3, "test"}
+    assert set(samples["p_du"]) <= {0.0, 0.25, 0.5, 0.75, 1.0}
+    assert np.all((-10.0 <= samples["p_float"]) & (samples["p_float"] <= 10.0))
+    assert np.allclose(
+        samples["p_float_step"] * 10, np.round(samples["p_float_step"] * 10)
+    )
+    assert set(samples["p_int"]) <= set(range(-10, 11, 2))
+    assert samples["p_int"].dtype.kind == "i"
+    assert np.all((1 <= samples["p_int_log"]) & (samples["p_int_log"] <= 100))
+    for name in ["p_lu", "p_float_log"]:
+        assert np.all((0.01 <= samples[name]) & (samples[name] <= 10.0))
+
+
+@pytest.mark.parametrize("method", ["random", "sobol"])
+def test_sample(conf, method: str) -> None:
+    samples = OmegaTuna.sample(conf, 256, method=method, seed=0)
+    _check(samples, 256)
+
+    # Log-scaled parameters are spread evenly in the log domain.
+    assert np.mean(samples["p_lu"] < 0.1) == pytest.approx(1 / 3, abs=0.1)
+
+    again = OmegaTuna.sample(conf, 256, method=method, seed=0)
+    assert all(np.array_equal(samples[k], again[k]) for k in samples)
+
+
+def test_grid() -> None:
+    conf = OmegaTuna.create(
+        {
+            "a": "${ot.categorical: {choices: [x, y, z]}}",
+            "b": "${ot.int: {low: 0, high: 1}}",
+            "c": "${ot.float: {low: 0.0, high: 1.0}}",
+        }
+    )
+    samples = OmegaTuna.sample(conf, 1000, method="grid")
+    rows = set(zip(samples["a"], samples["b"], samples["c"]))
+    assert len(rows) == len(samples["a"]) == 3 * 2 * 10
+    assert set(samples["c"]) >= {0.0, 1.0}
+
+    _check(OmegaTuna.sample(OmegaTuna.create(yaml_string), 100, method="grid"), 100)
+
+
+def test_grid_levels() -> None:
+    conf = OmegaTuna.create(
+        {
+            "a": "${ot.float: {low: 0.0, high: 1.0}}",
+            "b": "${ot.float: {low: 0.0, high: 1.0}}",
+        }
+    )
+    samples = OmegaTuna.sample(conf, 10, method="grid")
+    assert len(samples["a"]) == 9
+    assert set(samples["a"]) == set(samples["b"]) == {0.0, 0.5, 1.0}
+
+    conf = OmegaTuna.create(
+        {
+            "x": "${ot.categorical: {choices: [x, y, z, u, v]}}",
+            "i": "${ot.int: {low: 0, high: 9}}",
+            "f": "${ot.float: {low: 0.0, high: 1.0}}",
+        }
+    )
+    samples = OmegaTuna.sample(conf, 6, method="grid", seed=0)
+    assert len(samples["x"]) == 6
+    assert set(samples["x"]) == {"x", "y", "z", "u", "v"}
+    assert len(set(samples["i"])) == 6
+    assert set(samples["f"]) == set(np.linspace(0.0, 1.0, 6))
+
+
+def test_instantiate_samples(conf) -> None:
+    samples = OmegaTuna.sample(conf, 4, seed=1)
+    template = OmegaTuna.compile(conf)
+    for i, row in enumerate(rows(samples)):
+        assert template.instantiate(FixedTrial(row)).model.p_int == row["p_int"]
+        assert row["p_float"] == samples["p_float"][i]
+    assert i == 3
+
+
+def test_invalid_method(conf) -> None:
+    with pytest.raises(ValueError):
+        OmegaTuna.sample(conf, 4, method="lhs")
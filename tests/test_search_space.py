@@ -0,0 +1,99 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import optuna
+import pytest
+from optuna.distributions import (
+    CategoricalDistribution,
+    DiscreteUniformDistribution,
+    IntLogUniformDistribution,
+    IntUniformDistribution,
+    LogUniformDistribution,
+    UniformDistribution,
+)
+
+from omegatuna import OmegaTuna
+
+yaml_string = """
+p_cat: '${ot.categorical: {choices: [null, true, 1, 0.3, test], default: 1}}'
+p_du: '${ot.discrete_uniform: {low: 0.0, high: 1.0, q: 0.25}}'
+p_float: '${ot.float: {low: -10.0, high: 10.0, default: 0.5}}'
+p_float_log: '${ot.float: {low: 0.01, high: 10.0, log: true}}'
+p_float_step: '${ot.float: {low: 0.0, high: 1.0, step: 0.1}}'
+model:
+  p_int: '${ot.int: {low: -10, high: 10, step: 2}}'
+  p_int_log: '${ot.int: {low: 1, high: 100, log: true}}'
+p_lu: '${ot.loguniform: {low: 0.01, high: 10.0}}'
+p_u: '${ot.uniform: {low: -1.0, high: 1.0}}'
+other: 1
+"""
+
+
+def test_search_space() -> None:
+    conf = OmegaTuna.create(yaml_string)
+    distributions, defaults = OmegaTuna.search_space(conf)
+
+    assert distributions == {
+        "p_cat": CategoricalDistribution((None, True, 1, 0.3, "test")),
+        "p_du": DiscreteUniformDistribution(0.0, 1.0, 0.25),
+        "p_float": UniformDistribution(-10.0, 10.0),
+        "p_float_log": LogUniformDistribution(0.01, 10.0),
+        "p_float_step": DiscreteUniformDistribution(0.0, 1.0, 0.1),
+        "p_int": IntUniformDistribution(-10, 10, 2),
+        "p_int_log": IntLogUniformDistribution(1, 100),
+        "p_lu": LogUniformDistribution(0.01, 10.0),
+        "p_u": UniformDistribution(-1.0, 1.0),
+    }
+    assert defaults == {"p_cat": 1, "p_float": 0.5}
+
+
+def test_conflicting_distributions() -> None:
+    conf = OmegaTuna.create(
+        {
+            "a": "${ot.int: p, {low: 0, high: 10}}",
+            "b": "${ot.int: p, {low: 0, high: 5}}",
+        }
+    )
+    with pytest.raises(ValueError):
+        OmegaTuna.search_space(conf)
+
+
+def test_ask_with_fixed_distributions() -> None:
+    distributions, _ = OmegaTuna.search_space(OmegaTuna.create(yaml_string))
+
+    study = optuna.create_study()
+    trial = study.ask(distributions)
+    conf = OmegaTuna.create(yaml_string, trial=trial)
+    OmegaTuna.resolve(conf)
+
+    assert conf.model.p_int == trial.params["p_int"]
+    assert conf.p_float_step == trial.params["p_float_step"]
+    assert trial.distributions == distributions
+
+
+def test_dependent_parameters() -> None:
+    yaml = """
+    hidden: ${ot.int:hidden, {low:32, high:64}}
+    low_dim: ${ot.int:low_dim, {low:1, high:${hidden}, default:8}}
+    """
+    distributions, defaults = OmegaTuna.search_space(OmegaTuna.create(yaml))
+    assert distributions == {"hidden": IntUniformDistribution(32, 64)}
+    assert defaults == {"low_dim": 8}
+
+    study = optuna.create_study()
+    study.enqueue_trial({"hidden": 40})
+    trial = study.ask(distributions)
+    conf = OmegaTuna.create(yaml, trial=trial)
+    assert conf.low_dim <= 40
+    assert trial.distributions["low_dim"] == IntUniformDistribution(1, 40)
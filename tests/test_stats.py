@@ -0,0 +1,86 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import json
+
+import optuna
+import pytest
+
+import omegatuna
+from omegatuna import OmegaTuna
+
+config = {
+    "param_int": "${ot.int: {low: -10, high: 10}}",
+    "param_float": "${ot.float: {low: -10.0, high: 10.0}}",
+}
+
+
+@pytest.fixture
+def stats():
+    yield omegatuna.enable_stats()
+    omegatuna.disable_stats()
+
+
+def test_disabled() -> None:
+    assert omegatuna.get_stats() is None
+    conf = OmegaTuna.create(config, trial=optuna.create_study().ask())
+    OmegaTuna.resolve(conf)
+    assert omegatuna.get_stats() is None
+
+
+def test_stats(stats, tmpdir) -> None:
+    study = optuna.create_study()
+    trial = study.ask()
+    conf = OmegaTuna.create(config, trial=trial)
+    for _ in range(3):
+        conf.param_int
+    conf.param_float
+    OmegaTuna.merge(conf, {"other": 1})
+
+    assert stats.resolver_calls == {"param_int": 3, "param_float": 1}
+    assert stats.suggest_calls == {"param_int": 1, "param_float": 1}
+    assert stats.op_calls == {"create": 1, "merge": 1}
+    assert stats.op_time["create"] > 0
+
+    stats.set_user_attrs(trial)
+    assert trial.user_attrs["omegatuna.suggest_calls"] == 2
+
+    path = str(tmpdir.join("stats.jsonl"))
+    stats.dump(path, trial=trial.number)
+    stats.reset()
+    stats.dump(path)
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert records[0]["trial"] == trial.number
+    assert records[0]["suggest_calls"] == {"param_int": 1, "param_float": 1}
+    assert records[1]["suggest_calls"] == {}
+
+
+def test_user_attrs_per_trial(stats) -> None:
+    study = optuna.create_study()
+
+    def objective(trial):
+        conf = OmegaTuna.create(config, trial=trial)
+        conf.param_int
+        conf.param_float
+        stats.set_user_attrs(trial)
+        return 0.0
+
+    study.optimize(objective, n_trials=3)
+
+    for trial in study.trials:
+        assert trial.user_attrs["omegatuna.resolver_calls"] == 2
+        assert trial.user_attrs["omegatuna.suggest_calls"] == 2
+        assert set(trial.user_attrs["omegatuna.op_time"]) == {"create"}
+    assert stats.suggest_calls == {"param_int": 3, "param_float": 3}
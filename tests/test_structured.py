@@ -12,13 +12,18 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from dataclasses import dataclass
-from typing import Any
+import gc
+import itertools
+import weakref
+from dataclasses import dataclass, field, make_dataclass
+from typing import Any, Dict
 
 import pytest
+from omegaconf import OmegaConf, ValidationError
 from optuna.trial import BaseTrial, FixedTrial
 
 from omegatuna import II, SI, OmegaTuna
+from omegatuna.omegatuna import _get_trial, _structured_snapshots
 
 
 @pytest.fixture(params=[(3, 0.3, None), (2, 0.2, True)])
@@ -85,3 +90,84 @@ def test_structured_II(trial: BaseTrial):
     assert conf.param_cat == trial.suggest_categorical(
         "param_cat", choices=[None, True, 1, 0.3, "test"]
     )
+
+
+@dataclass
+class Nested:
+    inner: StructuredConfSI = field(default_factory=StructuredConfSI)
+    extra: Dict[str, int] = field(default_factory=dict)
+
+
+@pytest.mark.parametrize("eager", [False, True])
+def test_schema_cache(trial: BaseTrial, eager: bool):
+    first = OmegaTuna.structured(Nested, trial=trial, eager=eager)
+    snapshot = _structured_snapshots[Nested]
+    second = OmegaTuna.structured(Nested, trial=trial, eager=eager)
+
+    assert _structured_snapshots[Nested] is snapshot is not None
+    assert first is not second and first.inner is not second.inner
+    assert second.inner.param_int == trial.suggest_int("param_int", low=-10, high=10)
+    assert _get_trial(second) is trial
+    assert OmegaConf.get_type(second) is Nested
+
+    # Copies are independent and keep the schema.
+    first.extra.b = 2
+    assert "b" not in second.extra
+    with pytest.raises(ValidationError):
+        second.inner.param_int = "x"
+    assert OmegaConf.is_interpolation(OmegaTuna.structured(Nested).inner, "param_int")
+
+
+def test_schema_cache_not_used() -> None:
+    @dataclass
+    class Local:
+        x: int = 1
+
+    assert OmegaTuna.structured(Nested(extra={"b": 2})).extra == {"b": 2}
+    assert OmegaTuna.structured(Local, flags={"readonly": True}).x == 1
+    assert Local not in _structured_snapshots
+
+    # Local types cannot be pickled, and are not cached.
+    assert OmegaTuna.structured(Local).x == 1
+    assert _structured_snapshots[Local] is None
+    assert OmegaTuna.structured(Local).x == 1
+
+
+def test_schema_cache_is_weak() -> None:
+    # A picklable type that can be dropped: a module-level name bound temporarily.
+    cls = make_dataclass("Temp", [("x", int, 1)])
+    cls.__module__ = __name__
+    globals()["Temp"] = cls
+    try:
+        assert OmegaTuna.structured(cls).x == 1
+    finally:
+        del globals()["Temp"]
+    assert _structured_snapshots[cls] is not None
+
+    ref = weakref.ref(cls)
+    del cls
+    gc.collect()
+    assert ref() is None
+
+
+counter = itertools.count()
+
+
+@dataclass
+class WithFactory:
+    run_id: int = field(default_factory=lambda: next(counter))
+    nested: Nested = field(default_factory=Nested)
+
+
+@dataclass
+class WithNestedFactory:
+    inner: WithFactory = field(default_factory=WithFactory)
+
+
+@pytest.mark.parametrize("cls", [WithFactory, WithNestedFactory])
+def test_schema_cache_default_factory(cls) -> None:
+    confs = [OmegaTuna.structured(cls) for _ in range(3)]
+    ids = [c.run_id if cls is WithFactory else c.inner.run_id for c in confs]
+
+    assert len(set(ids)) == 3
+    assert _structured_snapshots[cls] is None
@@ -0,0 +1,171 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import optuna
+import pytest
+from omegaconf import OmegaConf
+from optuna.trial import FixedTrial
+
+from omegatuna import OmegaTuna
+from omegatuna.resolvers import collect_switches, suggest_all
+
+yaml_string = """
+optimizer: ${ot.categorical:optimizer, {choices:[adam, sgd]}}
+optimizer_params: ${ot.switch:${optimizer}, optimizers}
+optimizers:
+  adam:
+    lr: ${ot.float:adam_lr, {low:0.0, high:1.0}}
+  sgd:
+    lr: ${ot.float:sgd_lr, {low:0.0, high:1.0}}
+    momentum: ${ot.float:sgd_momentum, {low:0.0, high:1.0}}
+    nesterov: ${ot.switch:${ot.categorical:nesterov, {choices:[on, off]}}, nesterov}
+nesterov:
+  "on": ${ot.float:nesterov_dampening, {low:0.0, high:1.0}}
+  "off": 0.0
+"""
+
+
+@pytest.fixture
+def study():
+    return optuna.create_study()
+
+
+def test_switch_access() -> None:
+    conf = OmegaTuna.create(
+        yaml_string, trial=FixedTrial({"optimizer": "adam", "adam_lr": 0.1})
+    )
+
+    assert conf.optimizer_params.lr == 0.1
+    assert conf.optimizer_params is conf.optimizers.adam
+
+
+def test_collect_switches() -> None:
+    conf = OmegaTuna.create(yaml_string)
+
+    assert collect_switches(conf) == {
+        ("optimizer_params",): ("optimizers",),
+        ("optimizers", "sgd", "nesterov"): ("nesterov",),
+    }
+
+
+@pytest.mark.parametrize(
+    "optimizer, expected",
+    [("adam", {"optimizer", "adam_lr"}), ("sgd", {"optimizer", "sgd_lr"})],
+)
+def test_suggest_all_active_branch(study, optimizer, expected) -> None:
+    study.enqueue_trial({"optimizer": optimizer, "nesterov": "off"})
+    trial = study.ask()
+    conf = OmegaTuna.create(yaml_string, trial=trial)
+    suggest_all(conf)
+
+    if optimizer == "sgd":
+        expected = expected | {"sgd_momentum", "nesterov"}
+    assert set(trial.params) == expected
+
+
+def test_resolve_active_branch(study) -> None:
+    study.enqueue_trial({"optimizer": "adam"})
+    trial = study.ask()
+    conf = OmegaTuna.create(yaml_string, trial=trial)
+    container = OmegaTuna.to_container(conf, resolve=True)
+
+    assert set(trial.params) == {"optimizer", "adam_lr"}
+    assert container["optimizer_params"] == container["optimizers"]["adam"]
+    assert (
+        container["optimizers"]["sgd"]["lr"]
+        == "${ot.float:sgd_lr, {low:0.0, high:1.0}}"
+    )
+
+    OmegaTuna.resolve(conf)
+    assert set(trial.params) == {"optimizer", "adam_lr"}
+    assert OmegaConf.is_interpolation(conf.optimizers.sgd, "momentum")
+
+
+def test_to_yaml_active_branch(study) -> None:
+    study.enqueue_trial({"optimizer": "adam"})
+    trial = study.ask()
+    OmegaTuna.to_yaml(OmegaTuna.create(yaml_string, trial=trial), resolve=True)
+
+    assert set(trial.params) == {"optimizer", "adam_lr"}
+
+
+def test_eager_active_branch(study) -> None:
+    study.enqueue_trial({"optimizer": "sgd", "nesterov": "on"})
+    trial = study.ask()
+    conf = OmegaTuna.create(yaml_string, trial=trial, eager=True)
+
+    assert set(trial.params) == {
+        "optimizer",
+        "sgd_lr",
+        "sgd_momentum",
+        "nesterov",
+        "nesterov_dampening",
+    }
+    assert conf.optimizer_params.nesterov == conf.nesterov["on"]
+
+
+def test_template_active_branch(study) -> None:
+    study.enqueue_trial({"optimizer": "adam"})
+    trial = study.ask()
+    conf = OmegaTuna.compile(yaml_string).instantiate(trial)
+
+    assert set(trial.params) == {"optimizer", "adam_lr"}
+    assert conf.optimizer_params.lr == trial.params["adam_lr"]
+
+
+def test_switch_unknown_branch() -> None:
+    conf = OmegaTuna.create(
+        {"a": "x", "b": "${ot.switch:${a}, branches}", "branches": {}}
+    )
+
+    with pytest.raises(Exception, match="not a branch"):
+        conf.b
+
+
+@dataclass
+class Adam:
+    lr: float = "${ot.float:adam_lr, {low:0.0, high:1.0}}"  # type: ignore
+
+
+@dataclass
+class SGD:
+    lr: float = "${ot.float:sgd_lr, {low:0.0, high:1.0}}"  # type: ignore
+
+
+@dataclass
+class OptimizerParams:
+    adam: Adam = field(default_factory=Adam)
+    sgd: SGD = field(default_factory=SGD)
+
+
+@dataclass
+class StructuredConf:
+    optimizer: str = "${ot.categorical:optimizer, {choices:[adam, sgd]}}"
+    optimizer_params: OptimizerParams = field(default_factory=OptimizerParams)
+    opt: Any = "${ot.switch:${optimizer}, optimizer_params}"
+
+
+def test_structured_inactive_branch() -> None:
+    trial = FixedTrial({"optimizer": "adam", "adam_lr": 0.1})
+    conf = OmegaTuna.structured(StructuredConf, trial=trial)
+    container = OmegaTuna.to_container(conf, resolve=True)
+    assert container["opt"] == {"lr": 0.1}
+    assert OmegaTuna.to_yaml(conf, resolve=True).count("sgd_lr") == 1
+
+    conf = OmegaTuna.structured(StructuredConf, trial=trial, eager=True)
+    assert conf.opt.lr == 0.1
+    assert OmegaConf.is_interpolation(conf.optimizer_params.sgd, "lr")
@@ -0,0 +1,269 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pickle
+from dataclasses import dataclass, field
+from typing import Any, List
+
+import optuna
+import pytest
+from optuna.trial import BaseTrial, FixedTrial
+
+import omegatuna
+from omegatuna import SI, OmegaTuna
+
+
+@pytest.fixture(params=[(3, 0.3, None), (2, 0.2, True)])
+def trial(request) -> BaseTrial:
+    p_int, p_float, p_cat = request.param
+    return FixedTrial(
+        {
+            "param_int": p_int,
+            "param_float": p_float,
+            "param_cat": p_cat,
+        }
+    )
+
+
+yaml_string = """
+model:
+  param_int: ${ot.int:param_int, {low:-10, high:10}}
+  layers:
+    - '${ot.float: param_float, {low: -10.0, high: 10.0}}'
+    - 1
+param_cat: '${ot.categorical: {choices: [null, true, 1, 0.3, test], default: 1}}'
+alias: ${model.param_int}
+name: run_${param_cat}
+"""
+
+
+def test_specs() -> None:
+    template = OmegaTuna.compile(yaml_string)
+
+    assert set(template.specs) == {
+        ("model", "param_int"),
+        ("model", "layers", 0),
+        ("param_cat",),
+    }
+    spec = template.specs[("param_cat",)]
+    assert spec.resolver == "ot.categorical"
+    assert spec.name == "param_cat"
+    assert spec.kwargs == {"choices": [None, True, 1, 0.3, "test"]}
+    assert spec.default == 1
+
+
+def test_instantiate(trial: BaseTrial) -> None:
+    template = OmegaTuna.compile(yaml_string)
+
+    for _ in range(2):
+        conf = template.instantiate(trial)
+        assert conf.model.param_int == trial.suggest_int("param_int", -10, 10)
+        assert conf.model.layers[0] == trial.suggest_float("param_float", -10, 10)
+        assert conf.param_cat == trial.suggest_categorical(
+            "param_cat", [None, True, 1, 0.3, "test"]
+        )
+        assert conf.alias == conf.model.param_int
+        assert conf.name == f"run_{conf.param_cat}"
+        assert OmegaTuna.cache_info(conf).misses == 3
+
+    conf = template.instantiate()
+    with pytest.raises(Exception):
+        conf.model.param_int
+    assert conf.param_cat == 1
+
+
+@dataclass
+class StructuredConf:
+    param_int: int = SI("${ot.int: param_int, {low: -10, high: 10}}")
+    param_float: float = SI("${ot.float: param_float, {low: -10.0, high: 10.0}}")
+    values: List[Any] = field(default_factory=lambda: [1, 2])
+
+
+def test_instantiate_structured(trial: BaseTrial) -> None:
+    template = OmegaTuna.compile(OmegaTuna.structured(StructuredConf))
+    conf = template.instantiate(trial)
+
+    assert conf.param_int == trial.suggest_int("param_int", low=-10, high=10)
+    assert conf.param_float == trial.suggest_float("param_float", low=-10, high=10)
+    assert OmegaTuna.get_type(conf) is StructuredConf
+
+
+def test_compile_bound_config(trial: BaseTrial) -> None:
+    conf = OmegaTuna.create(yaml_string, trial=trial)
+    with pytest.raises(ValueError):
+        OmegaTuna.compile(conf)
+
+
+def test_instantiate_local_structured(trial: BaseTrial) -> None:
+    @dataclass
+    class LocalConf:
+        param_int: int = SI("${ot.int: param_int, {low: -10, high: 10}}")
+
+    template = OmegaTuna.compile(OmegaTuna.structured(LocalConf))
+    conf = template.instantiate(trial)
+
+    assert conf.param_int == trial.suggest_int("param_int", low=-10, high=10)
+    assert OmegaTuna.get_type(conf) is LocalConf
+
+
+dependent_yaml = """
+hidden: ${ot.int:hidden, {low:32, high:64}}
+low_dim: ${ot.int:low_dim, {low:1, high:${hidden}}}
+"""
+
+
+def test_instantiate_dependent() -> None:
+    template = pickle.loads(pickle.dumps(OmegaTuna.compile(dependent_yaml)))
+    assert not template.specs[("hidden",)].dependent
+    assert template.specs[("low_dim",)].dependent
+
+    study = optuna.create_study()
+    study.enqueue_trial({"hidden": 60})
+    trial = study.ask()
+    conf = template.instantiate(trial)
+
+    assert conf.hidden == 60
+    assert 1 <= conf.low_dim <= 60
+    assert trial.distributions[
+        "low_dim"
+    ] == optuna.distributions.IntUniformDistribution(1, 60)
+    assert OmegaTuna.cache_info(conf).misses == 2
+
+
+def test_create_batch() -> None:
+    study = optuna.create_study()
+    trials = [study.ask() for _ in range(4)]
+    confs = OmegaTuna.create_batch(yaml_string, trials)
+
+    assert len(confs) == 4
+    for conf, trial in zip(confs, trials):
+        assert conf.model.param_int == trial.params["param_int"]
+        assert conf.model.layers[0] == trial.params["param_float"]
+        assert OmegaTuna.cache_info(conf).misses == 3
+
+    template = OmegaTuna.compile(yaml_string)
+    assert len(OmegaTuna.create_batch(template, [study.ask()])) == 1
+
+
+def test_create_batch_constraints() -> None:
+    conf = {
+        "a": "${ot.int:a, {low:0, high:9}}",
+        "b": "${ot.int:b, {low:0, high:9}}",
+        "_constraints_": {"ordered": "a <= b"},
+    }
+    study = optuna.create_study()
+    for a in [1, 9, 2]:
+        study.enqueue_trial({"a": a, "b": 5})
+    trials = [study.ask() for _ in range(3)]
+    confs = OmegaTuna.create_batch(conf, trials)
+
+    assert confs[1] is None
+    assert [c.a for c in confs if c is not None] == [1, 2]
+    assert trials[2].params == {"a": 2, "b": 5}
+    for trial, c in zip(trials, confs):
+        if c is None:
+            study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+        else:
+            study.tell(trial, c.a)
+    assert [t.state.name for t in study.trials] == ["COMPLETE", "PRUNED", "COMPLETE"]
+
+
+def test_from_frozen_trials() -> None:
+    study = optuna.create_study()
+    study.optimize(
+        lambda t: OmegaTuna.create(yaml_string, trial=t, eager=True).model.param_int,
+        n_trials=3,
+    )
+
+    stats = omegatuna.enable_stats()
+    try:
+        confs = OmegaTuna.from_frozen_trials(yaml_string, study.trials, strict=True)
+        for conf, trial in zip(confs, study.trials):
+            assert conf.model.param_int == trial.params["param_int"]
+            assert conf.model.layers[0] == trial.params["param_float"]
+            assert conf.param_cat == trial.params["param_cat"]
+            assert conf.alias == conf.model.param_int
+        assert stats.suggest_calls == {}
+    finally:
+        omegatuna.disable_stats()
+
+
+def test_from_frozen_trials_skips_constraints() -> None:
+    conf = {
+        "a": "${ot.int:a, {low:0, high:9}}",
+        "b": "${ot.int:b, {low:0, high:9}}",
+        "_constraints_": {"ordered": "a <= b"},
+    }
+    trial = optuna.trial.create_trial(
+        params={"a": 9, "b": 2},
+        distributions={
+            "a": optuna.distributions.IntUniformDistribution(0, 9),
+            "b": optuna.distributions.IntUniformDistribution(0, 9),
+        },
+        value=0.0,
+    )
+
+    (frozen_conf,) = OmegaTuna.from_frozen_trials(conf, [trial], strict=True)
+    assert (frozen_conf.a, frozen_conf.b) == (9, 2)
+    assert trial.user_attrs == {}
+
+
+def test_from_frozen_trials_mismatches() -> None:
+    study = optuna.create_study()
+    study.optimize(
+        lambda t: t.suggest_int("param_int", 0, 5) + t.suggest_float("other", 0, 1),
+        n_trials=1,
+    )
+    trial = study.trials[0]
+
+    template = OmegaTuna.compile(yaml_string)
+    assert template.mismatches(trial) == [
+        f"'param_int' is stored with {trial.distributions['param_int']} instead of "
+        f"{template.specs[('model', 'param_int')].distribution()}",
+        "'param_float' is missing",
+        "'param_cat' is missing",
+        "'other' is not used",
+    ]
+    with pytest.warns(UserWarning, match="does not match"):
+        (conf,) = OmegaTuna.from_frozen_trials(template, [trial])
+    assert conf.model.param_int == trial.params["param_int"]
+
+    with pytest.raises(ValueError, match="'other' is not used"):
+        OmegaTuna.from_frozen_trials(template, [trial], strict=True)
+
+
+def test_from_frozen_trials_dependent() -> None:
+    study = optuna.create_study()
+
+    def objective(trial) -> float:
+        conf = OmegaTuna.create(dependent_yaml, trial=trial)
+        return float(conf.low_dim)
+
+    study.optimize(objective, n_trials=3)
+
+    template = OmegaTuna.compile(dependent_yaml)
+    assert all(template.mismatches(trial) == [] for trial in study.trials)
+    confs = OmegaTuna.from_frozen_trials(template, study.trials, strict=True)
+    for conf, trial in zip(confs, study.trials):
+        assert conf.low_dim == trial.params["low_dim"] <= conf.hidden
+
+    trial = optuna.trial.create_trial(
+        params={"hidden": 40, "low_dim": 1.5},
+        distributions={
+            "hidden": optuna.distributions.IntUniformDistribution(32, 64),
+            "low_dim": optuna.distributions.UniformDistribution(1, 40),
+        },
+        value=0.0,
+    )
+    assert len(template.mismatches(trial)) == 1
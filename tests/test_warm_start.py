@@ -0,0 +1,125 @@
+#  Copyright 2021 Shuhei Yoshida
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import optuna
+import pytest
+
+from omegatuna import OmegaTuna
+
+old_config = {
+    "param_int": "${ot.int:param_int, {low:0, high:10}}",
+    "param_float": "${ot.float:param_float, {low:0.0, high:1.0}}",
+    "param_cat": "${ot.categorical:param_cat, {choices:[a, b, c]}}",
+}
+
+new_config = {
+    "param_int": "${ot.int:param_int, {low:0, high:5, default:2}}",
+    "param_float": "${ot.float:param_float, {low:0.0, high:1.0, default:0.5}}",
+    "param_cat": "${ot.categorical:param_cat, {choices:[a, b]}}",
+    "param_new": "${ot.float:param_new, {low:0.0, high:1.0}}",
+}
+
+
+@pytest.fixture
+def old_study():
+    study = optuna.create_study()
+    for params in [
+        {"param_int": 1, "param_float": 0.1, "param_cat": "a"},
+        {"param_int": 8, "param_float": 0.2, "param_cat": "c"},
+    ]:
+        study.enqueue_trial(params)
+
+    def objective(trial):
+        conf = OmegaTuna.create(old_config, trial=trial, eager=True)
+        return conf.param_int + conf.param_float
+
+    study.optimize(objective, n_trials=2)
+    study.optimize(lambda t: t.suggest_int("unrelated", 0, 1), n_trials=1)
+    return study
+
+
+def test_warm_start(old_study) -> None:
+    study = optuna.create_study()
+    info = OmegaTuna.warm_start(study, OmegaTuna.create(new_config), old_study)
+
+    # The second prior trial has `param_int` and `param_cat` out of the new space.
+    assert info == (1, 2, False)
+    (trial,) = study.trials
+    assert trial.params == {"param_int": 1, "param_float": 0.1, "param_cat": "a"}
+    assert trial.value == pytest.approx(1.1)
+    assert trial.user_attrs["omegatuna.warm_start_from"] == 0
+    assert trial.distributions[
+        "param_int"
+    ] == optuna.distributions.IntUniformDistribution(0, 5)
+
+
+def test_warm_start_drops_unknown_params() -> None:
+    prior = optuna.trial.create_trial(
+        params={"param_float": 0.3, "removed": 1},
+        distributions={
+            "param_float": optuna.distributions.UniformDistribution(0.0, 1.0),
+            "removed": optuna.distributions.IntUniformDistribution(0, 1),
+        },
+        value=1.0,
+        system_attrs={"completed_rung_0": 1.0, "fixed_params": {"removed": 1}},
+    )
+    study = optuna.create_study()
+    info = OmegaTuna.warm_start(study, OmegaTuna.create(new_config), [prior])
+
+    assert info.added == 1
+    (trial,) = study.trials
+    assert trial.params == {"param_float": 0.3}
+    assert trial.system_attrs == {}
+
+
+def test_warm_start_enqueue_defaults(old_study) -> None:
+    study = optuna.create_study()
+    info = OmegaTuna.warm_start(
+        study, OmegaTuna.create(new_config), old_study.trials, enqueue_defaults=True
+    )
+    assert info.enqueued
+
+    trial = study.ask()
+    conf = OmegaTuna.create(new_config, trial=trial)
+    assert conf.param_int == 2
+    assert conf.param_float == 0.5
+
+
+def test_warm_start_dependent_params() -> None:
+    config = {
+        "hidden": "${ot.int:hidden, {low:32, high:64}}",
+        "low_dim": "${ot.int:low_dim, {low:1, high:${hidden}}}",
+    }
+    prior = optuna.create_study()
+    for params in [
+        {"hidden": 45, "low_dim": 33},
+        {"hidden": 60, "low_dim": 50},
+        {"hidden": 32, "low_dim": 4},
+    ]:
+        prior.enqueue_trial(params)
+
+    def objective(trial):
+        conf = OmegaTuna.create(config, trial=trial)
+        return float(conf.low_dim)
+
+    prior.optimize(objective, n_trials=3)
+
+    study = optuna.create_study()
+    info = OmegaTuna.warm_start(study, OmegaTuna.create(config), prior)
+
+    assert info.added == 3
+    assert info.skipped == 0
+    for old, new in zip(prior.trials, study.trials):
+        assert new.params == old.params
+        assert new.distributions["low_dim"] == old.distributions["low_dim"]